@@ -1,11 +1,50 @@
+import hashlib
+import io
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-from data_prep import load_dynamic_csv, clean_dynamic
-from eda import eda_summary, eda_plots
-from model import train_and_eval, feature_importance
+from data_prep import load_dynamic_csv, clean_dynamic, ConstraintIndex
+from eda import eda_summary, eda_plot_images
+from model import importance_report
+from model_store import load_or_train
 from recommender import recommend, pareto_frontier
 
+# camadas em cache chaveadas pelo hash do upload: cada etapa só recalcula quando a própria entrada muda.
+# Parâmetros com "_" não entram na chave do cache do streamlit; o digest/fingerprint faz esse papel.
+
+def upload_digest(uploaded) -> str:
+    # sha256 do conteúdo só na primeira vez que o arquivo aparece (file_id muda a cada upload)
+    digests = st.session_state.setdefault("upload_digests", {})
+    if uploaded.file_id not in digests:
+        digests[uploaded.file_id] = hashlib.sha256(uploaded.getvalue()).hexdigest()
+    return digests[uploaded.file_id]
+
+@st.cache_resource(show_spinner=False)
+def load_clean(digest: str, _uploaded) -> pd.DataFrame:
+    # cache_resource devolve o mesmo objeto a cada rerun (sem desserializar uma cópia);
+    # o frame é tratado como somente leitura daqui em diante
+    return clean_dynamic(load_dynamic_csv(io.BytesIO(_uploaded.getvalue())))
+
+@st.cache_data(show_spinner=False)
+def summary_for(digest: str, _df: pd.DataFrame):
+    return eda_summary(_df)
+
+@st.cache_data(show_spinner=False)
+def plots_for(digest: str, _df: pd.DataFrame):
+    return eda_plot_images(_df)
+
+@st.cache_resource(show_spinner=False)
+def index_for(digest: str, _df: pd.DataFrame) -> ConstraintIndex:
+    return ConstraintIndex(_df)
+
+@st.cache_resource(show_spinner=False)
+def model_for(digest: str, _df: pd.DataFrame, _force: bool = False):
+    return load_or_train(_df, force=_force)
+
+@st.cache_data(show_spinner=False)
+def importance_for(fingerprint: str, _tr):
+    return importance_report(_tr["model"], _tr["X_test"], _tr["y_test"])
+
 st.set_page_config(page_title="Recomendador de Rotas Dinâmicas", layout="wide")
 st.title("Recomendador de Rotas Dinâmicas")
 
@@ -24,37 +63,45 @@ with st.sidebar:
     theme = st.text_input("Preferred_Theme")
     transport = st.text_input("Preferred_Transport")
     topk = st.slider("Top-K recomendações", 1, 30, 10)
+    retrain = st.checkbox("Forçar retreino")
     run = st.button("Treinar e Recomendar")
 
 if uploaded is None:
     st.info("Aguardando CSV.")
 else:
-    raw = load_dynamic_csv(uploaded)
-    df = clean_dynamic(raw)
+    digest = upload_digest(uploaded)
+    df = load_clean(digest, uploaded)
     st.subheader("Amostra dos dados")
     st.dataframe(df.head(20))
     st.subheader("Resumo")
-    st.json(eda_summary(df))
-    p1, p2, p3, p4 = eda_plots(df)
+    st.json(summary_for(digest, df))
     st.subheader("Gráficos")
-    st.image([p1, p2, p3, p4], caption=["Duração","Custo","Satisfação por Clima","Duração por Tráfego"])
+    st.image(plots_for(digest, df), caption=["Duração","Custo","Satisfação por Clima","Duração por Tráfego"])
     if run:
+        if retrain:
+            model_for.clear()
         with st.spinner("Treinando modelo..."):
-            tr = train_and_eval(df)
-        st.success("Modelo treinado")
+            model_for(digest, df, _force=retrain)
+        # depois do primeiro clique, mudanças de filtro/cenário só refazem o recommend
+        st.session_state["model_digest"] = digest
+    if st.session_state.get("model_digest") == digest:
+        tr = model_for(digest, df)
+        st.success("Modelo carregado do cache" if tr["cache_hit"] else "Modelo treinado")
         st.write(tr["metrics"])
-        imp = feature_importance(tr["model"], tr["X_test"], tr["y_test"])
+        rep = importance_for(tr["fingerprint"], tr)
         st.subheader("Importância dos atributos")
-        st.dataframe(imp.head(20))
+        st.caption(f"{rep['method']} em {rep['rows']} linhas, {rep['runtime_sec']:.2f}s")
+        st.dataframe(rep["table"].head(20))
         constraints = {"max_duration": None if max_duration==0 else max_duration, "max_cost": None if max_cost==0 else max_cost, "budget": budget}
         overrides = {"Weather": weather if weather else None, "Traffic_Level": traffic if traffic else None, "Crowd_Density": crowd if crowd else None, "Event_Impact": event if event else None, "Preferred_Theme": theme if theme else None, "Preferred_Transport": transport if transport else None}
-        rec = recommend(df, tr["model"], constraints, overrides, top_k=topk)
+        scored = recommend(df, tr["model"], constraints, overrides, top_k=None, index=index_for(digest, df))
+        rec = scored.head(topk)
         st.subheader("Recomendações")
         if len(rec):
             st.dataframe(rec.reset_index(drop=True))
             st.download_button("Baixar recomendações CSV", data=rec.to_csv(index=False).encode("utf-8"), file_name="recommendations.csv", mime="text/csv")
             st.subheader("Trade-off Custo × Duração (fronteira de Pareto)")
-            fr, dom = pareto_frontier(rec, x_col="Total_Cost", y_col="Total_Duration", score_col="Predicted_Satisfaction")
+            fr, dom = pareto_frontier(scored, x_col="Total_Cost", y_col="Total_Duration", score_col="Predicted_Satisfaction")
             fig = plt.figure()
             plt.scatter(dom["Total_Cost"], dom["Total_Duration"], alpha=0.5)
             if len(fr):
@@ -62,5 +109,6 @@ else:
             plt.xlabel("Total_Cost")
             plt.ylabel("Total_Duration")
             st.pyplot(fig)
+            plt.close(fig)
         else:
             st.warning("Nenhuma rota atende aos filtros.")
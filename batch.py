@@ -0,0 +1,94 @@
+from __future__ import annotations
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, Sequence
+import numpy as np
+from bnb import BoundEngine, branch_and_bound
+from heuristics import greedy_itinerary
+
+SOLVERS = ("bnb", "greedy")
+
+def solve_team(values: np.ndarray, visit_time: np.ndarray, T: np.ndarray,
+               time_limit: float | Sequence[float], k: int | None = None, solver: str = "bnb",
+               bounds: BoundEngine | None = None, exclude: Sequence[int] | None = None,
+               **bnb_kwargs) -> Dict:
+    # team orienteering por decomposição sequencial: k rotas com POIs disjuntos (viajantes ou
+    # dias). Cada rota é resolvida com os POIs das anteriores em `exclude`, sobre o mesmo
+    # BoundEngine. `time_limit` pode ser um valor por rota; as rotas mais longas escolhem primeiro
+    if solver not in SOLVERS:
+        raise ValueError(f"solver desconhecido: {solver}")
+    t0 = time.time()
+    values = np.asarray(values, dtype=np.float64)
+    visit_time = np.asarray(visit_time, dtype=np.float64)
+    T = np.asarray(T, dtype=np.float64)
+    if np.ndim(time_limit) == 0:
+        if k is None:
+            raise ValueError("informe k ou uma lista de time_limit")
+        limits = [float(time_limit)] * k
+    else:
+        limits = [float(t) for t in time_limit]
+        if k is not None and k != len(limits):
+            raise ValueError("k diferente do número de time_limit")
+    if solver == "bnb" and bounds is None:
+        bounds = BoundEngine(values, visit_time, T)
+
+    used = [int(j) for j in exclude] if exclude is not None else []
+    routes: List[Dict] = [None] * len(limits)
+    expanded = 0
+    for r in sorted(range(len(limits)), key=lambda r: -limits[r]):
+        if solver == "bnb":
+            res = branch_and_bound(values, visit_time, T, limits[r], bounds=bounds, exclude=used, **bnb_kwargs)
+            route, value, total_time = res["best_route"], res["best_value"], res["best_time"]
+            expanded += res["expanded_nodes"]
+        else:
+            res = greedy_itinerary(values, visit_time, T, limits[r], exclude=used)
+            route, value, total_time = res["route"], res["total_value"], res["total_time"]
+        routes[r] = {"route": route, "total_value": float(value), "total_time": float(total_time),
+                     "time_limit": limits[r]}
+        used.extend(route[1:-1])
+    return {
+        "routes": routes,
+        "total_value": float(sum(r["total_value"] for r in routes)),
+        "expanded_nodes": expanded,
+        "runtime_sec": time.time() - t0,
+    }
+
+# estado por processo do pool: T e os mínimos de aresta chegam uma vez pelo initializer
+_BATCH: Dict = {}
+
+def _init_batch(T: np.ndarray, edge_minima) -> None:
+    _BATCH["T"] = T
+    _BATCH["edge_minima"] = edge_minima
+
+def _solve_one(inst: Dict, solver: str, bnb_kwargs: Dict) -> Dict:
+    T = _BATCH["T"]
+    values = np.asarray(inst["values"], dtype=np.float64)
+    visit_time = np.asarray(inst["visit_time"], dtype=np.float64)
+    bounds = BoundEngine(values, visit_time, T, _BATCH["edge_minima"]) if solver == "bnb" else None
+    exclude = inst.get("exclude")
+    k = inst.get("k")
+    if (k is not None and k > 1) or np.ndim(inst["time_limit"]) > 0:
+        return solve_team(values, visit_time, T, inst["time_limit"], k, solver=solver,
+                          bounds=bounds, exclude=exclude, **bnb_kwargs)
+    if solver == "greedy":
+        return greedy_itinerary(values, visit_time, T, inst["time_limit"], exclude=exclude)
+    return branch_and_bound(values, visit_time, T, inst["time_limit"], bounds=bounds, exclude=exclude, **bnb_kwargs)
+
+def solve_many(instances: Sequence[Dict], T: np.ndarray, solver: str = "bnb", workers: int | None = None,
+               **bnb_kwargs) -> List[Dict]:
+    # instâncias independentes sobre a mesma matriz T, cada uma um dict com values, visit_time,
+    # time_limit e opcionalmente exclude / k (k > 1 ou lista de time_limit -> solve_team).
+    # Resultados na ordem de entrada
+    if solver not in SOLVERS:
+        raise ValueError(f"solver desconhecido: {solver}")
+    T = np.asarray(T, dtype=np.float64)
+    edge_minima = BoundEngine.edge_minima(T)
+    workers = min(workers or os.cpu_count() or 1, max(len(instances), 1))
+    if workers <= 1:
+        _init_batch(T, edge_minima)
+        return [_solve_one(inst, solver, bnb_kwargs) for inst in instances]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch,
+                             initargs=(T, edge_minima)) as pool:
+        return list(pool.map(_solve_one, instances, repeat(solver), repeat(bnb_kwargs)))
@@ -0,0 +1,246 @@
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List
+import numpy as np
+import pandas as pd
+
+PROFILES = {
+    "quick": {"pois": (10, 50, 200, 1000), "rows": (1_000, 100_000), "time_cap": 2.0},
+    "full": {"pois": (10, 50, 200, 1000, 5000), "rows": (1_000, 100_000, 1_000_000, 10_000_000), "time_cap": 10.0},
+}
+KINDS = ("euclidean", "clustered")
+
+# métrica -> direção boa ("lower"/"higher"); tempos abaixo de MIN_SEC são ruído e não entram na comparação
+DIRECTIONS = {"wall_sec": "lower", "peak_rss_mb": "lower", "nodes_per_sec": "higher",
+              "best_value": "higher", "ingest_sec": "lower", "recommend_sec": "lower"}
+MIN_SEC = 0.05
+
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+
+def make_instance(n: int, kind: str = "euclidean", seed: int = 0, time_limit: float = 240.0) -> Dict[str, Any]:
+    # nó 0 = depósito no centro de um quadrado 100x100; tempo de viagem = distância (1 unidade/min)
+    rng = np.random.default_rng(seed)
+    if kind == "euclidean":
+        xy = rng.uniform(0, 100, size=(n, 2))
+    elif kind == "clustered":
+        centers = rng.uniform(10, 90, size=(max(2, n // 50), 2))
+        xy = centers[rng.integers(0, len(centers), n)] + rng.normal(0, 5, size=(n, 2))
+        xy = np.clip(xy, 0, 100)
+    else:
+        raise ValueError(f"tipo de instância desconhecido: {kind}")
+    xy[0] = (50.0, 50.0)
+    T = np.sqrt(((xy[:, None, :] - xy[None, :, :]) ** 2).sum(-1))
+    values = rng.integers(1, 11, n).astype(np.float64)
+    visit_time = rng.uniform(5, 30, n)
+    values[0] = 0.0
+    visit_time[0] = 0.0
+    return {"values": values, "visit_time": visit_time, "T": T, "coords": xy, "time_limit": time_limit}
+
+_VOCAB = {
+    "Weather": ["Sunny", "Rainy", "Cloudy", "Snowy"],
+    "Traffic_Level": ["Low", "Medium", "High"],
+    "Crowd_Density": ["Low", "Medium", "High"],
+    "Event_Impact": ["None", "Festival", "Concert", "Sports"],
+    "Gender": ["Male", "Female", "Other"],
+    "Nationality": ["USA", "India", "Brazil", "Germany", "Japan", "France"],
+    "Travel_Companions": ["Solo", "Couple", "Family", "Group"],
+    "Budget_Category": ["Low", "Medium", "High"],
+    "Preferred_Theme": ["Adventure", "Cultural", "Relaxation", "Shopping", "Nature"],
+    "Preferred_Transport": ["Bus", "Taxi", "Walk", "Bike", "Metro"],
+}
+
+def _synthetic_chunk(rng: np.random.Generator, start: int, n: int) -> pd.DataFrame:
+    k = rng.integers(3, 8, n)
+    picks = [rng.choice(np.arange(1, 51), size=m, replace=False) for m in k]
+    seqs = ["->".join(map(str, p)) for p in picks]
+    df = pd.DataFrame({
+        "Route_ID": np.arange(start + 1, start + n + 1),
+        "User_ID": rng.integers(1, 500, n),
+        "Sequence": seqs,
+        "Total_Duration": rng.integers(60, 600, n),
+        "Total_Cost": rng.integers(100, 5000, n),
+    })
+    for c in ("Weather", "Traffic_Level", "Crowd_Density", "Event_Impact"):
+        df[c] = rng.choice(_VOCAB[c], n)
+    df["Optimal_Route_Preference"] = ["->".join(map(str, np.sort(p))) for p in picks]
+    # alvo com algum sinal (clima/tráfego/duração) para o modelo não ser ruído puro
+    score = 3 + (df["Weather"] == "Sunny") - (df["Traffic_Level"] == "High") - (df["Total_Duration"] > 400) \
+        + rng.integers(-1, 2, n)
+    df["Satisfaction_Score"] = np.clip(score, 1, 5).astype(int)
+    df["Age"] = rng.integers(18, 70, n)
+    for c in ("Gender", "Nationality", "Travel_Companions", "Budget_Category", "Preferred_Theme", "Preferred_Transport"):
+        df[c] = rng.choice(_VOCAB[c], n)
+    return df
+
+def write_synthetic_dynamic(path: str, n_rows: int, seed: int = 0, chunk_rows: int = 500_000) -> str:
+    # escreve em blocos para que 10M linhas não precisem caber na memória de uma vez
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    for start in range(0, n_rows, chunk_rows):
+        chunk = _synthetic_chunk(rng, start, min(chunk_rows, n_rows - start))
+        chunk.to_csv(tmp, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    os.replace(tmp, path)
+    return path
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def _bench_solver(n: int, kind: str, seed: int, time_cap: float, k: int = 20) -> Dict[str, Any]:
+    from bnb import branch_and_bound
+    from heuristics import greedy_itinerary
+    from spatial import knn_candidates
+    inst = make_instance(n, kind, seed)
+    cands = knn_candidates(inst["T"], k, None) if n > 200 else None
+    t0 = time.perf_counter()
+    g = greedy_itinerary(inst["values"], inst["visit_time"], inst["T"], inst["time_limit"], cands)
+    greedy_sec = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    res = branch_and_bound(inst["values"], inst["visit_time"], inst["T"], inst["time_limit"],
+                           max_nodes=1_000_000, time_cap_seconds=time_cap, candidates=cands)
+    wall = time.perf_counter() - t0
+    best = res["best_value"]
+    return {
+        "name": f"bnb/{kind}/n={n}",
+        "wall_sec": wall,
+        "greedy_sec": greedy_sec,
+        "expanded_nodes": res["expanded_nodes"],
+        "nodes_per_sec": res["expanded_nodes"] / max(res["runtime_sec"], 1e-9),
+        "best_value": best,
+        "greedy_value": g["total_value"],
+        "gap_vs_greedy": (best - g["total_value"]) / best if best > 0 else 0.0,
+        "gap_to_bound": res["gap"],
+        "hit_time_cap": res["runtime_sec"] >= time_cap,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+def _bench_recommend(n_rows: int, seed: int, data_dir: str) -> Dict[str, Any]:
+    from data_prep import load_dynamic_clean, split_features, ConstraintIndex
+    from model import build_model
+    from recommender import recommend
+    path = os.path.join(data_dir, f"dynamic_{n_rows}_{seed}.csv")
+    if not os.path.exists(path):
+        write_synthetic_dynamic(path, n_rows, seed)
+    t0 = time.perf_counter()
+    df = load_dynamic_clean(path, cache=False)
+    ingest = time.perf_counter() - t0
+    # o one-hot denso de Optimal_Route_Preference cresce com as linhas: treina numa amostra pequena,
+    # o que interessa aqui é o custo de servir (filtro + scoring) sobre a tabela inteira
+    X, y = split_features(df.sample(min(len(df), 5_000), random_state=seed))
+    model = build_model(backend="ridge").fit(X, y)
+    t0 = time.perf_counter()
+    index = ConstraintIndex(df)
+    index_sec = time.perf_counter() - t0
+    constraints = {"max_duration": 400, "max_cost": 3000, "budget": "Medium"}
+    overrides = {"Weather": "Rainy", "Traffic_Level": "High"}
+    t0 = time.perf_counter()
+    rec = recommend(df, model, constraints, overrides, top_k=10, index=index)
+    rec_sec = time.perf_counter() - t0
+    return {
+        "name": f"recommend/rows={n_rows}",
+        "wall_sec": ingest + index_sec + rec_sec,
+        "ingest_sec": ingest,
+        "index_sec": index_sec,
+        "recommend_sec": rec_sec,
+        "rows_per_sec": n_rows / max(rec_sec, 1e-9),
+        "returned": int(len(rec)),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+def _isolated(fn, *args) -> Dict[str, Any]:
+    # um processo novo por caso: ru_maxrss é monotônico, então o pico só é confiável isolado
+    with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as ex:
+        return ex.submit(fn, *args).result()
+
+def run_benchmarks(profile: str = "quick", seed: int = 0, data_dir: str = "bench_data",
+                   kinds=KINDS, log=print) -> Dict[str, Any]:
+    if profile not in PROFILES:
+        raise ValueError(f"perfil desconhecido: {profile}")
+    cfg = PROFILES[profile]
+    results: List[Dict[str, Any]] = []
+    for n in cfg["pois"]:
+        for kind in kinds:
+            r = _isolated(_bench_solver, n, kind, seed, cfg["time_cap"])
+            log(f"{r['name']}: {r['nodes_per_sec']:.0f} nós/s, gap vs guloso {r['gap_vs_greedy']:.3f}, "
+                f"{r['wall_sec']:.2f}s, {r['peak_rss_mb']:.0f} MB")
+            results.append(r)
+    for rows in cfg["rows"]:
+        r = _isolated(_bench_recommend, rows, seed, data_dir)
+        log(f"{r['name']}: ingest {r['ingest_sec']:.2f}s, recommend {r['recommend_sec']:.3f}s, {r['peak_rss_mb']:.0f} MB")
+        results.append(r)
+    return {
+        "meta": {"profile": profile, "seed": seed, "python": platform.python_version(),
+                 "machine": platform.machine(), "cpus": os.cpu_count(),
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25) -> List[Dict[str, Any]]:
+    # regressão = piora relativa acima de `tolerance` na direção ruim da métrica
+    base = {r["name"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for r in current.get("results", []):
+        b = base.get(r["name"])
+        if b is None:
+            continue
+        for metric, direction in DIRECTIONS.items():
+            if metric not in r or metric not in b:
+                continue
+            new, old = float(r[metric]), float(b[metric])
+            if metric.endswith("_sec") and max(new, old) < MIN_SEC:
+                continue
+            if direction == "lower":
+                worse = new > old * (1 + tolerance)
+            else:
+                worse = new < old * (1 - tolerance)
+            if worse:
+                regressions.append({"name": r["name"], "metric": metric, "baseline": old, "current": new,
+                                    "change": (new - old) / old if old else float("inf")})
+    return regressions
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--data-dir", type=str, default="bench_data", help="onde ficam os dynamic.csv sintéticos")
+    p.add_argument("--out", type=str, default="bench_results.json")
+    p.add_argument("--baseline", type=str, default=DEFAULT_BASELINE)
+    p.add_argument("--tolerance", type=float, default=0.25)
+    p.add_argument("--update-baseline", action="store_true")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    res = run_benchmarks(args.profile, args.seed, args.data_dir)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(res, f, indent=2)
+    print(f"Resultados salvos em {args.out}")
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+        print(f"Baseline atualizado: {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("Sem baseline para comparar.")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regs = compare(res, baseline, args.tolerance)
+    for r in regs:
+        print(f"REGRESSÃO {r['name']} {r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g} ({r['change']:+.1%})")
+    if regs:
+        sys.exit(1)
+    print("Sem regressões em relação ao baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
 
 from __future__ import annotations
+import os
 import time
 import heapq
+import multiprocessing as mp
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Set, Tuple, Dict
+from typing import Callable, List, Set, Tuple, Dict, Sequence
 import numpy as np
+from heuristics import greedy_itinerary
 
 @dataclass(order=True)
 class Node:
@@ -45,11 +50,472 @@ def fractional_bound(values: np.ndarray, visit_time: np.ndarray, T: np.ndarray,
         cap -= cost * take
     return ub
 
+class _NodeStore:
+    # nós da busca em arrays pré-alocados; `parent` permite reconstruir a rota.
+    # Contagem de referências: cada nó é mantido pela entrada na fronteira (ou pelo incumbente)
+    # e por cada filho vivo. Nó podado/descartado libera a cadeia de pais que ficou sem uso e os
+    # slots voltam por `free`, então a memória acompanha a fronteira, não o total de expansões
+    __slots__ = ("bound", "value", "time_used", "current", "parent", "depth", "refs", "mask",
+                 "free", "size", "live", "peak")
+
+    def __init__(self, capacity: int = 1024):
+        self.bound = np.empty(capacity, dtype=np.float64)
+        self.value = np.empty(capacity, dtype=np.float64)
+        self.time_used = np.empty(capacity, dtype=np.float64)
+        self.current = np.empty(capacity, dtype=np.int32)
+        self.parent = np.empty(capacity, dtype=np.int64)
+        self.depth = np.empty(capacity, dtype=np.int32)
+        self.refs = np.empty(capacity, dtype=np.int32)
+        self.mask: List[int] = []  # bitmask de visitados (int Python, sem limite de n)
+        self.free: List[int] = []
+        self.size = 0
+        self.live = self.peak = 0
+
+    def _grow(self) -> None:
+        cap = 2 * len(self.value)
+        for name in ("bound", "value", "time_used", "current", "parent", "depth", "refs"):
+            old = getattr(self, name)
+            arr = np.empty(cap, dtype=old.dtype)
+            arr[:self.size] = old[:self.size]
+            setattr(self, name, arr)
+
+    def add(self, bound: float, value: float, time_used: float, current: int,
+            parent: int, depth: int, mask: int) -> int:
+        # devolve o nó com uma referência (a de quem o guarda: fronteira ou incumbente)
+        if self.free:
+            i = self.free.pop()
+            self.mask[i] = mask
+        else:
+            if self.size == len(self.value):
+                self._grow()
+            i = self.size
+            self.mask.append(mask)
+            self.size += 1
+        self.bound[i] = bound
+        self.value[i] = value
+        self.time_used[i] = time_used
+        self.current[i] = current
+        self.parent[i] = parent
+        self.depth[i] = depth
+        self.refs[i] = 1
+        if parent >= 0:
+            self.refs[parent] += 1
+        self.live += 1
+        if self.live > self.peak:
+            self.peak = self.live
+        return i
+
+    def release(self, i: int) -> None:
+        # solta uma referência; o que zerar volta para `free`, subindo pelos pais
+        refs, parent = self.refs, self.parent
+        while i >= 0:
+            refs[i] -= 1
+            if refs[i] > 0:
+                return
+            self.mask[i] = 0
+            self.free.append(i)
+            self.live -= 1
+            i = int(parent[i])
+
+    def route(self, i: int) -> List[int]:
+        route = []
+        while i >= 0:
+            route.append(int(self.current[i]))
+            i = int(self.parent[i])
+        route.reverse()
+        return route + [0]
+
+class _DominanceTable:
+    # tabela de transposição (current, visited) -> rótulos de Pareto (time_used, value).
+    # Dois nós com o mesmo (current, visited) têm os mesmos sucessores; se um deles gasta mais
+    # tempo e não vale mais, nada abaixo dele supera o outro. Memória limitada por LRU de chaves
+    # e por `max_labels` rótulos por chave (perder um rótulo só reduz a poda, não a corretude)
+    __slots__ = ("table", "max_entries", "max_labels", "lookups", "hits", "pruned", "evictions")
+
+    def __init__(self, max_entries: int = 100_000, max_labels: int = 8):
+        self.table: OrderedDict = OrderedDict()
+        self.max_entries = max_entries
+        self.max_labels = max_labels
+        self.lookups = self.hits = self.pruned = self.evictions = 0
+
+    def admit_many(self, children: List[int], parent_mask: int, times: List[float],
+                   values: List[float]) -> List[bool]:
+        # um booleano por filho: False se (time_used, value) é dominado; senão registra o rótulo.
+        # Em lote (uma chamada por expansão) e com os atributos em locais: é o laço mais quente da busca
+        table, get, max_entries, max_labels = self.table, self.table.get, self.max_entries, self.max_labels
+        out = []
+        hits = pruned = 0
+        for j, time_used, value in zip(children, times, values):
+            key = (j, parent_mask | (1 << j))
+            labels = get(key)
+            if labels is None:
+                table[key] = [(time_used, value)]
+                if len(table) > max_entries:
+                    table.popitem(last=False)
+                    self.evictions += 1
+                out.append(True)
+                continue
+            hits += 1
+            table.move_to_end(key)
+            dominated = False
+            for t, v in labels:
+                if t <= time_used + 1e-9 and v >= value - 1e-9:
+                    dominated = True
+                    break
+            if dominated:
+                pruned += 1
+                out.append(False)
+                continue
+            labels[:] = [(t, v) for t, v in labels if not (time_used <= t and value >= v)]
+            labels.append((time_used, value))
+            if len(labels) > max_labels:
+                del labels[0]
+            out.append(True)
+        self.lookups += len(out)
+        self.hits += hits
+        self.pruned += pruned
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        return {"lookups": self.lookups, "hits": self.hits, "pruned": self.pruned,
+                "evictions": self.evictions, "entries": len(self.table)}
+
+def _mask_to_bool(mask: int, n: int) -> np.ndarray:
+    raw = np.frombuffer(mask.to_bytes((n + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:n].astype(bool)
+
+class BoundEngine:
+    # relaxação pré-computada uma vez por instância. Cada aresta T[a, b] de uma rota é
+    # dividida ao meio entre suas pontas, então visitar i custa no mínimo
+    # visit_time[i] + (menor chegada em i + menor saída de i) / 2, independente da ordem;
+    # os POIs ficam ordenados por valor / esse custo (mochila fracionária válida)
+    __slots__ = ("order", "cost_sorted", "gain_sorted", "tail")
+    CHUNK_CELLS = 1 << 20  # células por bloco em children_bounds (~8 MB por temporário float64)
+
+    def __init__(self, values: np.ndarray, visit_time: np.ndarray, T: np.ndarray,
+                 edge_minima: Tuple[np.ndarray, np.ndarray] | None = None):
+        # `edge_minima` (ver BoundEngine.edge_minima) evita refazer a varredura O(n²) de T
+        # quando várias instâncias compartilham a mesma matriz
+        values = np.asarray(values, dtype=np.float64)
+        visit_time = np.asarray(visit_time, dtype=np.float64)
+        n = len(values)
+        min_in, min_out = edge_minima if edge_minima is not None else self.edge_minima(T)
+        cost = visit_time + 0.5 * (min_in + min_out)
+        cost = np.maximum(cost, 1e-9)
+        gain = np.maximum(values, 0.0)  # itens de valor negativo nunca aumentam o bound
+        items = np.arange(1, n)  # o depósito não é item da mochila
+        order = items[np.argsort(-(gain[items] / cost[items]), kind="stable")]
+        self.order = order
+        self.cost_sorted = cost[order]
+        self.gain_sorted = gain[order]
+        # meia aresta de saída do nó atual e meia de chegada ao depósito
+        self.tail = 0.5 * (min_out + (min_in[0] if n > 1 else 0.0))
+
+    @staticmethod
+    def edge_minima(T: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # menor chegada e menor saída de cada nó; só depende de T
+        T = np.asarray(T, dtype=np.float64)
+        n = len(T)
+        if n <= 1:
+            return np.zeros(n), np.zeros(n)
+        off = T.copy()
+        np.fill_diagonal(off, np.inf)
+        return off.min(axis=0), off.min(axis=1)
+
+    def children_bounds(self, children: np.ndarray, visited: np.ndarray,
+                        child_values: np.ndarray, caps: np.ndarray) -> np.ndarray:
+        # mochila fracionária para todos os filhos de um nó de uma vez: `visited` é o
+        # vetor booleano do pai e cada filho j ainda exclui o próprio j
+        children = np.asarray(children)
+        order = self.order
+        m = len(order)
+        child_values = np.asarray(child_values, dtype=np.float64)
+        caps = np.asarray(caps, dtype=np.float64)
+        if m == 0:
+            return child_values
+        # as matrizes temporárias são (filhos x POIs): em instâncias grandes (raiz com milhares
+        # de filhos) processa em blocos de linhas para limitar a memória
+        rows_per_chunk = max(1, self.CHUNK_CELLS // m)
+        if len(children) > rows_per_chunk:
+            return np.concatenate([
+                self.children_bounds(children[k:k + rows_per_chunk], visited,
+                                     child_values[k:k + rows_per_chunk], caps[k:k + rows_per_chunk])
+                for k in range(0, len(children), rows_per_chunk)])
+        avail = ~visited[order][None, :] & (order[None, :] != children[:, None])
+        cost = np.where(avail, self.cost_sorted[None, :], 0.0)
+        gain = np.where(avail, self.gain_sorted[None, :], 0.0)
+        cum_cost = np.cumsum(cost, axis=1)
+        cum_gain = np.cumsum(gain, axis=1)
+        caps = caps - self.tail[children]
+        # itens mascarados têm custo 0, então o primeiro índice acima de cap é sempre um item real
+        k = (cum_cost <= caps[:, None]).sum(axis=1)
+        rows = np.arange(len(children))
+        prev = np.where(k > 0, cum_cost[rows, k - 1], 0.0)
+        full = np.where(k > 0, cum_gain[rows, k - 1], 0.0)
+        kk = np.minimum(k, m - 1)
+        part = np.where(k < m, gain[rows, kk] * (caps - prev) / np.where(cost[rows, kk] > 0, cost[rows, kk], 1.0), 0.0)
+        ub = child_values + full + part
+        return np.where(caps > 0, ub, child_values)
+
+    def bound(self, current: int, visited: np.ndarray, value: float, cap: float) -> float:
+        ub = self.children_bounds(np.array([current]), visited, np.array([value]), np.array([cap]))
+        return float(ub[0])
+
+POLICIES = ("best_first", "depth_first", "beam")
+# teto padrão da fronteira: acima disso a busca descarta os piores bounds (e reporta o gap)
+MAX_FRONTIER = 250_000
+
 def branch_and_bound(values: np.ndarray, visit_time: np.ndarray, T: np.ndarray,
                      time_limit: float, max_nodes: int = 100000, policy: str = "best_first",
-                     time_cap_seconds: float | None = None) -> Dict:
-  
-    
+                     time_cap_seconds: float | None = None, engine: str = "compact",
+                     beam_width: int = 64, warm_start: bool = True,
+                     max_frontier: int | None = MAX_FRONTIER,
+                     candidates: List[np.ndarray] | None = None,
+                     progress: Callable[[Dict], None] | None = None, progress_every: int = 1000,
+                     profile: bool = False, dominance: int | None = 100_000,
+                     bounds: BoundEngine | None = None, exclude: Sequence[int] | None = None) -> Dict:
+    # `bounds` reaproveita um BoundEngine já montado para (values, visit_time, T);
+    # `exclude` marca POIs como já visitados (ex.: atribuídos a outra rota/dia)
+    if engine == "node":
+        if policy != "best_first":
+            raise ValueError("engine='node' suporta apenas policy='best_first'")
+        if progress is not None or profile or exclude is not None:
+            raise ValueError("engine='node' não suporta progress/profile/exclude")
+        return _branch_and_bound_nodes(values, visit_time, T, time_limit, max_nodes, time_cap_seconds)
+    if engine != "compact":
+        raise ValueError(f"engine desconhecida: {engine}")
+    return _search(values, visit_time, T, time_limit, max_nodes, policy, time_cap_seconds,
+                   beam_width=beam_width, warm_start=warm_start, max_frontier=max_frontier,
+                   candidates=candidates, progress=progress, progress_every=progress_every,
+                   profile=profile, dominance=dominance, bounds=bounds, exclude=exclude)
+
+def _frontier_bound(frontier: List[Tuple[float, int]], next_level: List[Tuple[float, int]],
+                    best_first: bool) -> float:
+    # maior bound ainda em aberto (o topo do heap no best_first; varredura nas pilhas/níveis)
+    top = -frontier[0][0] if best_first and frontier else max((-b for b, _ in frontier), default=-np.inf)
+    return max(top, max((-b for b, _ in next_level), default=-np.inf))
+
+def _search(values: np.ndarray, visit_time: np.ndarray, T: np.ndarray, time_limit: float,
+            max_nodes: int, policy: str, time_cap_seconds: float | None,
+            beam_width: int = 64, warm_start: bool = True, max_frontier: int | None = MAX_FRONTIER,
+            bounds: BoundEngine | None = None, root_children: Sequence[int] | None = None,
+            shared_best=None, candidates: List[np.ndarray] | None = None,
+            progress: Callable[[Dict], None] | None = None, progress_every: int = 1000,
+            profile: bool = False, dominance: int | None = 100_000,
+            exclude: Sequence[int] | None = None, deadline: float | None = None) -> Dict:
+    # busca compacta; `root_children` restringe a subárvore explorada e `shared_best`
+    # (multiprocessing.Value "d") compartilha o incumbente entre processos.
+    # best_first é exata até max_frontier (padrão MAX_FRONTIER), que limita a memória descartando
+    # os piores bounds (e então a busca deixa de ser exata), assim como beam mantém só `beam_width`
+    # nós por nível. `peak_store` conta os nós vivos no store (fronteira + cadeias de pais).
+    # Com `candidates` (listas k-NN por nó) cada expansão só olha os vizinhos do nó atual:
+    # o bound continua válido, mas a busca passa a ser heurística.
+    # Instrumentação: `progress(info)` a cada `progress_every` expansões (incumbente, melhor bound,
+    # gap, fronteira, nós/s); `profile` cronometra warm start / bound / expansão. O trace do
+    # incumbente só cresce em melhorias, então fica sempre ligado.
+    # `dominance` = nº máximo de chaves da tabela de dominância (None/0 desliga).
+    # `deadline` (time.time() absoluto) vale junto com time_cap_seconds; para o que vier antes
+    if policy not in POLICIES:
+        raise ValueError(f"policy desconhecida: {policy}")
+    best_first = policy == "best_first"
+    beam = policy == "beam"
+
+    t0 = time.time()
+    stop_at = deadline
+    if time_cap_seconds is not None:
+        stop_at = t0 + time_cap_seconds if stop_at is None else min(stop_at, t0 + time_cap_seconds)
+    values = np.asarray(values, dtype=np.float64)
+    visit_time = np.asarray(visit_time, dtype=np.float64)
+    T = np.asarray(T, dtype=np.float64)
+    n = len(values)
+    if bounds is None:
+        bounds = BoundEngine(values, visit_time, T)
+    to_depot = T[:, 0]
+    shared_raw = shared_best.get_obj() if shared_best is not None else None
+    allowed_root = np.asarray(root_children, dtype=np.int64) if root_children is not None else None
+
+    store = _NodeStore()
+    root_visited = np.zeros(n, dtype=bool)
+    root_visited[0] = True
+    root_mask = 1
+    if exclude is not None:
+        for j in exclude:
+            root_visited[j] = True
+            root_mask |= 1 << int(j)
+    root_bound = bounds.bound(0, root_visited, 0.0, time_limit)
+    root = store.add(root_bound, 0.0, 0.0, 0, -1, 0, root_mask)
+
+    frontier: List[Tuple[float, int]] = [(-root_bound, root)]
+    next_level: List[Tuple[float, int]] = []
+    best_value, best_time, best_node = 0.0, 0.0, -1
+    seed_route = [0, 0]
+    t_warm = time.perf_counter()
+    if warm_start:
+        g = greedy_itinerary(values, visit_time, T, time_limit, candidates, exclude)
+        best_value, best_time, seed_route = g["total_value"], g["total_time"], g["route"]
+    t_warm = time.perf_counter() - t_warm
+    trace: List[Tuple[float, float, int]] = [(time.time() - t0, best_value, 0)]
+    t_bound = t_expand = 0.0
+    expanded = 0
+    max_depth = 0
+    peak_frontier = 1
+    truncated = False
+    dropped_bound = -np.inf  # maior bound descartado por beam/max_frontier
+    table = _DominanceTable(dominance) if dominance else None
+
+    while True:
+        if not frontier:
+            if not (beam and next_level):
+                break
+            next_level.sort()
+            frontier = next_level[:beam_width]
+            if len(next_level) > beam_width:
+                truncated = True
+                dropped_bound = max(dropped_bound, -next_level[beam_width][0])
+                for _, k in next_level[beam_width:]:
+                    store.release(k)
+            frontier.reverse()  # pop() devolve o maior bound do nível
+            next_level = []
+        if expanded >= max_nodes:
+            break
+        if stop_at is not None and time.time() >= stop_at:
+            break
+
+        neg_bound, i = heapq.heappop(frontier) if best_first else frontier.pop()
+        threshold = best_value if shared_raw is None else max(best_value, shared_raw.value)
+        if -neg_bound <= threshold + 1e-9:
+            store.release(i)
+            continue
+
+        if profile:
+            t_node = time.perf_counter()
+        cur = int(store.current[i])
+        node_value = float(store.value[i])
+        node_time = float(store.time_used[i])
+        node_mask = store.mask[i]
+        depth = int(store.depth[i]) + 1
+
+        visited = _mask_to_bool(node_mask, n)
+        if candidates is None:
+            rem = np.flatnonzero(~visited)
+        else:
+            rem = candidates[cur]
+            rem = rem[~visited[rem]]
+        if i == root and allowed_root is not None:
+            rem = rem[np.isin(rem, allowed_root)]
+        new_times = node_time + T[cur, rem] + visit_time[rem]
+        feasible = new_times + to_depot[rem] <= time_limit
+        children = rem[feasible]
+        pushed: List[Tuple[float, int]] = []
+        if children.size:
+            new_times = new_times[feasible]
+            new_values = node_value + values[children]
+            if profile:
+                t_b = time.perf_counter()
+                child_bounds = bounds.children_bounds(children, visited, new_values, time_limit - new_times)
+                t_bound += time.perf_counter() - t_b
+            else:
+                child_bounds = bounds.children_bounds(children, visited, new_values, time_limit - new_times)
+            # filtro vetorizado antes do laço Python: só passa quem pode virar incumbente ou tem
+            # bound acima do limiar atual (o limiar só sobe dentro do laço, que checa de novo)
+            alive = (child_bounds > threshold + 1e-9) | (new_values > best_value)
+            if table is not None and alive.any():
+                # um filho dominado nunca é incumbente novo (quem o domina já valia mais e já
+                # atualizou best_value), então sai aqui junto com os podados pelo bound
+                idx = np.flatnonzero(alive)
+                ok = table.admit_many(children[idx].tolist(), node_mask, new_times[idx].tolist(),
+                                      new_values[idx].tolist())
+                alive[idx[~np.array(ok)]] = False
+            if not alive.all():
+                children, new_times = children[alive], new_times[alive]
+                new_values, child_bounds = new_values[alive], child_bounds[alive]
+            for j, new_time, new_value, bound in zip(children.tolist(), new_times.tolist(),
+                                                     new_values.tolist(), child_bounds.tolist()):
+                child_mask = node_mask | (1 << j)
+                if new_value > best_value:
+                    child = store.add(bound, new_value, new_time, j, i, depth, child_mask)
+                    if best_node >= 0:
+                        store.release(best_node)
+                    best_value, best_time, best_node = new_value, new_time + to_depot[j], child
+                    trace.append((time.time() - t0, best_value, expanded))
+                    if shared_best is not None:
+                        with shared_best.get_lock():
+                            if best_value > shared_raw.value:
+                                shared_raw.value = best_value
+                        threshold = max(best_value, shared_raw.value)
+                    else:
+                        threshold = best_value
+                    if bound > threshold + 1e-9:
+                        store.refs[child] += 1  # incumbente e fronteira
+                        pushed.append((-bound, child))
+                elif bound > threshold + 1e-9:
+                    child = store.add(bound, new_value, new_time, j, i, depth, child_mask)
+                    pushed.append((-bound, child))
+        store.release(i)  # os filhos criados acima já seguram o nó
+        if best_first:
+            for item in pushed:
+                heapq.heappush(frontier, item)
+        elif beam:
+            next_level.extend(pushed)
+        else:
+            # maior bound no topo da pilha
+            pushed.sort(reverse=True)
+            frontier.extend(pushed)
+        peak_frontier = max(peak_frontier, len(frontier) + len(next_level))
+        if max_frontier is not None and len(frontier) > max_frontier:
+            keep = max(1, max_frontier // 2)
+            if best_first:
+                frontier.sort()  # lista ordenada continua sendo um heap
+                dropped = frontier[keep:]
+                frontier = frontier[:keep]
+            else:
+                dropped = frontier[:-keep]
+                frontier = frontier[-keep:]
+            dropped_bound = max(dropped_bound, max(-b for b, _ in dropped))
+            for _, k in dropped:
+                store.release(k)
+            truncated = True
+
+        expanded += 1
+        max_depth = max(max_depth, depth - 1)
+        if profile:
+            t_expand += time.perf_counter() - t_node
+        if progress is not None and expanded % progress_every == 0:
+            elapsed = time.time() - t0
+            upper = max(best_value, dropped_bound, _frontier_bound(frontier, next_level, best_first))
+            progress({"expanded": expanded, "incumbent": best_value, "best_bound": upper,
+                      "gap": (upper - best_value) / upper if upper > 0 else 0.0,
+                      "frontier": len(frontier) + len(next_level),
+                      "nodes_per_sec": expanded / max(elapsed, 1e-9), "elapsed_sec": elapsed})
+
+    runtime = time.time() - t0
+    # limite superior global: o que sobrou em aberto (parada por nós/tempo) ou foi descartado
+    best_bound = max(best_value, dropped_bound, _frontier_bound(frontier, next_level, best_first))
+    out_phase = {}
+    if profile:
+        out_phase = {"phase_sec": {"warm_start": t_warm, "bound": t_bound, "expand": t_expand - t_bound,
+                                   "total": runtime}}
+    return {
+        "best_route": store.route(best_node) if best_node >= 0 else seed_route,
+        "best_value": best_value,
+        "best_time": float(best_time),
+        "expanded_nodes": expanded,
+        "max_depth": max_depth,
+        "peak_frontier": peak_frontier,
+        "peak_store": store.peak,
+        "frontier_truncated": truncated,
+        "runtime_sec": runtime,
+        "best_bound": float(best_bound),
+        "gap": float((best_bound - best_value) / best_bound) if best_bound > 0 else 0.0,
+        "incumbent_trace": trace,
+        "dominance": table.stats() if table is not None else None,
+        **out_phase
+    }
+
+def _branch_and_bound_nodes(values: np.ndarray, visit_time: np.ndarray, T: np.ndarray,
+                             time_limit: float, max_nodes: int = 100000,
+                             time_cap_seconds: float | None = None) -> Dict:
+    # motor original (um Node por filho); mantido como referência
     t0 = time.time()
     start = Node(priority=0.0, bound=0.0, value=0.0, time_used=0.0, current=0, visited=(0,), depth=0)
     start.bound = fractional_bound(values, visit_time, T, start, time_limit)
@@ -114,3 +580,93 @@ def branch_and_bound(values: np.ndarray, visit_time: np.ndarray, T: np.ndarray,
         "max_depth": max_depth,
         "runtime_sec": runtime
     }
+
+_WORKER: Dict = {}
+
+def _init_worker(shared_best, values: np.ndarray, visit_time: np.ndarray, T: np.ndarray) -> None:
+    # uma BoundEngine por processo, reaproveitada por todas as subárvores do worker
+    _WORKER["shared_best"] = shared_best
+    _WORKER["instance"] = (values, visit_time, T)
+    _WORKER["bounds"] = BoundEngine(values, visit_time, T)
+
+def _run_subtree(policy: str, root_children: List[int], time_limit: float, max_nodes: int,
+                 deadline: float | None, beam_width: int,
+                 max_frontier: int | None, dominance: int | None = 100_000) -> Dict:
+    values, visit_time, T = _WORKER["instance"]
+    # o incumbente guloso já vem semeado em shared_best pelo processo pai; o prazo é absoluto,
+    # então uma tarefa que esperou na fila não ganha um time cap novo
+    res = _search(values, visit_time, T, time_limit, max_nodes, policy, None, deadline=deadline,
+                  beam_width=beam_width, warm_start=False, max_frontier=max_frontier,
+                  bounds=_WORKER["bounds"], root_children=root_children,
+                  shared_best=_WORKER["shared_best"], dominance=dominance)
+    res["policy"] = policy
+    res["root_children"] = root_children
+    return res
+
+def parallel_branch_and_bound(values: np.ndarray, visit_time: np.ndarray, T: np.ndarray,
+                              time_limit: float, max_nodes: int = 100000,
+                              policies: Sequence[str] = ("best_first",), workers: int | None = None,
+                              time_cap_seconds: float | None = None, beam_width: int = 64,
+                              warm_start: bool = True, max_frontier: int | None = MAX_FRONTIER,
+                              dominance: int | None = 100_000) -> Dict:
+    # cada política do portfólio recebe uma fatia dos workers e divide entre eles os filhos
+    # da raiz; todos podam com o mesmo incumbente em memória compartilhada. Com menos workers
+    # que tarefas, as da fila correm até o mesmo prazo absoluto t0 + time_cap_seconds
+    t0 = time.time()
+    deadline = t0 + time_cap_seconds if time_cap_seconds is not None else None
+    values = np.asarray(values, dtype=np.float64)
+    visit_time = np.asarray(visit_time, dtype=np.float64)
+    T = np.asarray(T, dtype=np.float64)
+    for p in policies:
+        if p not in POLICIES:
+            raise ValueError(f"policy desconhecida: {p}")
+    workers = workers or os.cpu_count() or 1
+
+    seed = {"route": [0, 0], "total_value": 0.0, "total_time": 0.0}
+    if warm_start:
+        seed = greedy_itinerary(values, visit_time, T, time_limit)
+
+    first = np.arange(1, len(values))
+    first = first[T[0, first] + visit_time[first] + T[first, 0] <= time_limit]
+    if first.size == 0:
+        return {"best_route": seed["route"], "best_value": seed["total_value"],
+                "best_time": seed["total_time"], "best_policy": None, "expanded_nodes": 0,
+                "max_depth": 0, "peak_frontier": 0, "peak_store": 0, "runtime_sec": time.time() - t0,
+                "workers": []}
+    # filhos mais promissores primeiro, distribuídos em round-robin para equilibrar a carga
+    ratio = values[first] / np.maximum(T[0, first] + visit_time[first] + T[first, 0], 1e-9)
+    first = first[np.argsort(-ratio, kind="stable")].tolist()
+    per_policy = max(1, min(len(first), workers // len(policies)))
+    groups = [first[g::per_policy] for g in range(per_policy)]
+    node_budget = max(1, max_nodes // per_policy)
+
+    shared_best = mp.Value("d", seed["total_value"])
+    with ProcessPoolExecutor(max_workers=min(workers, per_policy * len(policies)),
+                             initializer=_init_worker,
+                             initargs=(shared_best, values, visit_time, T)) as pool:
+        futures = [pool.submit(_run_subtree, p, g, time_limit, node_budget, deadline,
+                               beam_width, max_frontier, dominance)
+                   for p in policies for g in groups]
+        results = [f.result() for f in futures]
+
+    best = max(results, key=lambda r: r["best_value"])
+    if best["best_value"] > seed["total_value"]:
+        route, value, total_time, policy = best["best_route"], best["best_value"], best["best_time"], best["policy"]
+    else:
+        route, value, total_time, policy = seed["route"], seed["total_value"], seed["total_time"], "greedy"
+    return {
+        "best_route": route,
+        "best_value": value,
+        "best_time": total_time,
+        "best_policy": policy,
+        "expanded_nodes": sum(r["expanded_nodes"] for r in results),
+        "max_depth": max(r["max_depth"] for r in results),
+        "peak_frontier": max(r["peak_frontier"] for r in results),
+        "peak_store": max(r["peak_store"] for r in results),
+        "runtime_sec": time.time() - t0,
+        "workers": [{"policy": r["policy"], "root_children": r["root_children"],
+                     "expanded_nodes": r["expanded_nodes"], "best_value": r["best_value"],
+                     "peak_frontier": r["peak_frontier"], "peak_store": r["peak_store"],
+                     "runtime_sec": r["runtime_sec"]}
+                    for r in results]
+    }
@@ -1,6 +1,9 @@
 from __future__ import annotations
+import os
+import hashlib
 import pandas as pd
 import numpy as np
+from typing import Tuple, Dict, Any
 
 CATS = ["Weather","Traffic_Level","Crowd_Density","Event_Impact","Optimal_Route_Preference","Gender","Nationality","Travel_Companions","Budget_Category","Preferred_Theme","Preferred_Transport"]
 NUMS = ["Total_Duration","Total_Cost","Age","User_ID"]
@@ -43,12 +46,171 @@ def clean_dynamic(df: pd.DataFrame) -> pd.DataFrame:
         df["Sequence"] = ""
     return df
 
+_MISSING = {"", "nan", "NaN", "None"}
+
+def _clean_categorical(s: pd.Series) -> pd.Categorical:
+    # limpeza feita nas categorias (poucas) e remapeada pelos códigos, sem tocar cada linha como string
+    if not isinstance(s.dtype, pd.CategoricalDtype):
+        s = s.astype("category")
+    names = s.cat.categories.astype(str).str.strip()
+    names = np.where(np.isin(names, list(_MISSING)), "Unknown", names)
+    uniq, remap = np.unique(np.append(names, "Unknown"), return_inverse=True)
+    codes = s.cat.codes.to_numpy()
+    codes = np.where(codes < 0, remap[-1], remap[codes])
+    return pd.Categorical.from_codes(codes, categories=uniq)
+
+def _downcast(s: pd.Series) -> pd.Series:
+    if (s % 1 == 0).all() and s.notna().all():
+        return pd.to_numeric(s, downcast="integer")
+    return s.astype(np.float32)
+
+def clean_dynamic_fast(df: pd.DataFrame) -> pd.DataFrame:
+    # mesmas regras de clean_dynamic, com CATS como category e numéricos reduzidos
+    cols = {}
+    for c in NUMS + [TARGET]:
+        if c in df.columns:
+            cols[c] = pd.to_numeric(df[c], errors="coerce")
+    keep = cols["Total_Duration"].notna() & cols["Total_Cost"].notna()
+    if TARGET in cols:
+        keep &= cols[TARGET].notna()
+    keep = keep.to_numpy()
+    n = int(keep.sum())
+    out = {}
+    for c in IDCOLS:
+        out[c] = df[c].to_numpy()[keep].astype(str) if c in df.columns else np.full(n, "")
+    out["Total_Duration"] = _downcast(cols["Total_Duration"][keep].clip(lower=1))
+    out["Total_Cost"] = _downcast(cols["Total_Cost"][keep].clip(lower=0))
+    if "Age" in cols:
+        age = cols["Age"][keep]
+        out["Age"] = _downcast(age.fillna(age.median()))
+    else:
+        out["Age"] = np.full(n, 40, dtype=np.int8)
+    out["User_ID"] = _downcast(cols["User_ID"][keep]) if "User_ID" in cols else np.zeros(n, dtype=np.int8)
+    for c in CATS:
+        if c in df.columns:
+            out[c] = _clean_categorical(df[c][keep])
+        else:
+            out[c] = pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=["Unknown"])
+    if TARGET in cols:
+        out[TARGET] = _downcast(cols[TARGET][keep])
+    extra = [c for c in df.columns if c not in out]
+    res = pd.DataFrame({k: (v.to_numpy() if isinstance(v, pd.Series) else v) for k, v in out.items()})
+    for c in extra:
+        res[c] = df[c].to_numpy()[keep]
+    return res[[c for c in df.columns if c in res.columns] + [c for c in res.columns if c not in df.columns]]
+
+def _ingest_cache_path(path: str) -> Tuple[str, str]:
+    try:
+        import pyarrow  # noqa: F401
+        return f"{path}.clean.parquet", "parquet"
+    except ImportError:
+        return f"{path}.clean.pkl", "pickle"
+
+def load_dynamic_clean(path: str, cache: bool = True) -> pd.DataFrame:
+    # leitura com dtypes explícitos + clean_dynamic_fast; o resultado limpo fica em cache
+    # ao lado do CSV (parquet se houver pyarrow, senão pickle) e é invalidado pelo mtime
+    cache_path, fmt = _ingest_cache_path(path)
+    if cache and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+        return pd.read_parquet(cache_path) if fmt == "parquet" else pd.read_pickle(cache_path)
+    header = pd.read_csv(path, nrows=0).columns
+    if "Route_ID" not in header:
+        raise ValueError("CSV inválido para schema dynamic.csv")
+    dtypes = {c: "category" for c in CATS if c in header}
+    dtypes.update({c: str for c in IDCOLS if c in header})
+    df = clean_dynamic_fast(pd.read_csv(path, dtype=dtypes))
+    if cache:
+        if fmt == "parquet":
+            df.to_parquet(cache_path, index=False)
+        else:
+            df.to_pickle(cache_path)
+    return df
+
+def iter_dynamic_csv(path: str, chunksize: int = 100_000):
+    for i, chunk in enumerate(pd.read_csv(path, chunksize=chunksize)):
+        if i == 0 and "Route_ID" not in chunk.columns:
+            raise ValueError("CSV inválido para schema dynamic.csv")
+        yield chunk
+
+def sample_dynamic_csv(path: str, n_rows: int = 200_000, chunksize: int = 100_000, seed: int = 42) -> pd.DataFrame:
+    # amostra uniforme em uma passada (bottom-k por chave aleatória), memória O(n_rows + chunksize)
+    rng = np.random.default_rng(seed)
+    sample = None
+    for chunk in iter_dynamic_csv(path, chunksize):
+        chunk = chunk.assign(_key=rng.random(len(chunk)))
+        sample = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+        if len(sample) > n_rows:
+            sample = sample.nsmallest(n_rows, "_key")
+    if sample is None:
+        raise ValueError("CSV vazio")
+    return sample.drop(columns="_key").reset_index(drop=True)
+
+def parse_route_sequences(s: pd.Series, sep: str = "->") -> Tuple[np.ndarray, np.ndarray]:
+    # "42->32->48" por linha -> layout CSR: POIs da linha i em flat[offsets[i]:offsets[i + 1]]
+    text = s.fillna("").astype(str).str.strip()
+    text = text.where(~text.isin(list(_MISSING)), "")
+    lengths = np.where(text.to_numpy() == "", 0, text.str.count(sep).to_numpy() + 1)
+    offsets = np.zeros(len(text) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    nonempty = text[lengths > 0].tolist()
+    flat = np.array(sep.join(nonempty).split(sep), dtype=np.int32) if nonempty else np.empty(0, dtype=np.int32)
+    return flat, offsets
+
 def split_features(df: pd.DataFrame):
     X = df[NUMS + CATS]
     y = df[TARGET]
     return X, y
 
-def filter_constraints(df: pd.DataFrame, max_duration: float | None, max_cost: float | None, budget: str | None) -> pd.DataFrame:
+class ConstraintIndex:
+    # índice estático sobre o frame limpo (vale até o próximo retreino): duração e custo
+    # ordenados para searchsorted e as linhas de cada Budget_Category. A consulta parte do
+    # menor conjunto candidato e confere os demais predicados só nessas linhas
+    __slots__ = ("n", "duration", "cost", "budget", "dur_sorted", "dur_rows", "cost_sorted", "cost_rows",
+                 "budget_codes", "budget_rows")
+
+    def __init__(self, df: pd.DataFrame):
+        self.n = len(df)
+        self.duration = df["Total_Duration"].to_numpy()
+        self.cost = df["Total_Cost"].to_numpy()
+        self.dur_rows = np.argsort(self.duration, kind="stable")
+        self.dur_sorted = self.duration[self.dur_rows]
+        self.cost_rows = np.argsort(self.cost, kind="stable")
+        self.cost_sorted = self.cost[self.cost_rows]
+        self.budget = None
+        self.budget_codes = {}
+        self.budget_rows = {}
+        if "Budget_Category" in df.columns:
+            codes, uniq = pd.factorize(df["Budget_Category"].astype(str), sort=False)
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(uniq) + 1))
+            self.budget = codes
+            self.budget_codes = {u: i for i, u in enumerate(uniq)}
+            self.budget_rows = {u: order[bounds[i]:bounds[i + 1]] for i, u in enumerate(uniq)}
+
+    def query(self, max_duration: float | None, max_cost: float | None, budget: str | None) -> np.ndarray:
+        # posições (iloc) das linhas que atendem aos filtros, em ordem crescente
+        use_budget = bool(budget) and budget != "Any" and self.budget is not None
+        sets = []
+        if max_duration is not None:
+            sets.append(self.dur_rows[:np.searchsorted(self.dur_sorted, max_duration, side="right")])
+        if max_cost is not None:
+            sets.append(self.cost_rows[:np.searchsorted(self.cost_sorted, max_cost, side="right")])
+        if use_budget:
+            sets.append(self.budget_rows.get(budget, np.empty(0, dtype=np.int64)))
+        if not sets:
+            return np.arange(self.n)
+        rows = min(sets, key=len)
+        if max_duration is not None:
+            rows = rows[self.duration[rows] <= max_duration]
+        if max_cost is not None:
+            rows = rows[self.cost[rows] <= max_cost]
+        if use_budget:
+            rows = rows[self.budget[rows] == self.budget_codes.get(budget, -2)]
+        return np.sort(rows)
+
+def filter_constraints(df: pd.DataFrame, max_duration: float | None, max_cost: float | None, budget: str | None,
+                       index: ConstraintIndex | None = None) -> pd.DataFrame:
+    if index is not None:
+        return df.iloc[index.query(max_duration, max_cost, budget)]
     g = df.copy()
     if max_duration is not None:
         g = g[g["Total_Duration"] <= max_duration]
@@ -64,3 +226,103 @@ def to_recommendation_table(df: pd.DataFrame, preds: np.ndarray) -> pd.DataFrame
     cols = ["Route_ID","User_ID","Sequence","Total_Duration","Total_Cost","Weather","Traffic_Level","Crowd_Density","Event_Impact","Preferred_Theme","Preferred_Transport","Budget_Category","Satisfaction_Score","Predicted_Satisfaction"]
     cols = [c for c in cols if c in out.columns]
     return out[cols].sort_values("Predicted_Satisfaction", ascending=False)
+
+POI_DEFAULTS = {"rating": 4.0, "price_level": 1.0, "est_time_min": 60.0}
+DEPOT_NAME = "Hotel/Depósito"
+EARTH_RADIUS_KM = 6371.0088
+
+def clean_and_standardize(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    # CSV de POIs (name, latitude, longitude [, rating, price_level, est_time_min]);
+    # devolve o frame limpo e um registro das decisões tomadas
+    dec: Dict[str, Any] = {"rows_in": len(df), "filled_defaults": {}}
+    g = df.copy()
+    g["name"] = g["name"].astype(str).str.strip()
+    g["latitude"] = pd.to_numeric(g["latitude"], errors="coerce")
+    g["longitude"] = pd.to_numeric(g["longitude"], errors="coerce")
+    valid = g["latitude"].between(-90, 90) & g["longitude"].between(-180, 180)
+    dec["dropped_invalid_coords"] = int((~valid).sum())
+    g = g[valid]
+    before = len(g)
+    g = g.drop_duplicates(subset=["name", "latitude", "longitude"])
+    dec["dropped_duplicates"] = before - len(g)
+    for c, default in POI_DEFAULTS.items():
+        g[c] = pd.to_numeric(g[c], errors="coerce") if c in g.columns else np.nan
+        dec["filled_defaults"][c] = int(g[c].isna().sum())
+        g[c] = g[c].fillna(default)
+    g["est_time_min"] = g["est_time_min"].clip(lower=0)
+    if "poi_id" not in g.columns:
+        g["poi_id"] = np.arange(1, len(g) + 1)
+    dec["rows_out"] = len(g)
+    return g.reset_index(drop=True), dec
+
+def _haversine_block(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    dlat = lat2[None, :] - lat1[:, None]
+    dlon = lon2[None, :] - lon1[:, None]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1)[:, None] * np.cos(lat2)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def _matrix_cache_key(lat: np.ndarray, lon: np.ndarray, speed_kmh: float) -> str:
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(lat, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(lon, dtype=np.float64).tobytes())
+    h.update(repr(float(speed_kmh)).encode("utf-8"))
+    return h.hexdigest()[:32]
+
+def build_distance_time_matrices(df: pd.DataFrame, start_lat: float, start_lon: float, speed_kmh: float,
+                                 cache_dir: str | None = None, mmap_threshold: int = 2000,
+                                 block_rows: int = 1024) -> Tuple[np.ndarray, np.ndarray, pd.DataFrame]:
+    # D (km) e T (min) em float32, linha/coluna 0 = hotel/depósito. Com cache_dir, as matrizes
+    # ficam em .npy chaveadas pelo conjunto de POIs e pela velocidade; a partir de mmap_threshold
+    # nós são escritas e lidas via memmap, sem materializar n² floats em memória
+    depot = {"poi_id": 0, "name": DEPOT_NAME, "latitude": start_lat, "longitude": start_lon,
+             "rating": 0.0, "price_level": 0.0, "est_time_min": 0.0}
+    pts = pd.concat([pd.DataFrame([depot]), df.reset_index(drop=True)], ignore_index=True)
+    lat = pts["latitude"].to_numpy(dtype=np.float64)
+    lon = pts["longitude"].to_numpy(dtype=np.float64)
+    n = len(pts)
+    use_mmap = n >= mmap_threshold
+
+    paths = None
+    if cache_dir is not None:
+        key = _matrix_cache_key(lat, lon, speed_kmh)
+        paths = (os.path.join(cache_dir, f"{key}_D.npy"), os.path.join(cache_dir, f"{key}_T.npy"))
+        if all(os.path.exists(p) for p in paths):
+            mode = "r" if use_mmap else None
+            return np.load(paths[0], mmap_mode=mode), np.load(paths[1], mmap_mode=mode), pts
+        os.makedirs(cache_dir, exist_ok=True)
+
+    if paths is not None and use_mmap:
+        tmp = [f"{p}.tmp.npy" for p in paths]
+        D = np.lib.format.open_memmap(tmp[0], mode="w+", dtype=np.float32, shape=(n, n))
+        T = np.lib.format.open_memmap(tmp[1], mode="w+", dtype=np.float32, shape=(n, n))
+    else:
+        D = np.empty((n, n), dtype=np.float32)
+        T = np.empty((n, n), dtype=np.float32)
+    rlat, rlon = np.radians(lat), np.radians(lon)
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        d = _haversine_block(rlat[start:stop], rlon[start:stop], rlat, rlon)
+        D[start:stop] = d
+        T[start:stop] = d / speed_kmh * 60.0
+
+    if paths is not None:
+        if use_mmap:
+            D.flush()
+            T.flush()
+            del D, T
+            for t, p in zip(tmp, paths):
+                os.replace(t, p)
+            return np.load(paths[0], mmap_mode="r"), np.load(paths[1], mmap_mode="r"), pts
+        for arr, p in zip((D, T), paths):
+            np.save(f"{p}.tmp.npy", arr)
+            os.replace(f"{p}.tmp.npy", p)
+    return D, T, pts
+
+def solver_inputs(pts: pd.DataFrame, w_rating: float = 1.0, w_cost: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    # valor = w_rating*rating - w_cost*price_level e tempo de visita por nó; depósito zerado
+    values = (w_rating * pts["rating"].to_numpy(dtype=np.float64)
+              - w_cost * pts["price_level"].to_numpy(dtype=np.float64))
+    visit_time = pts["est_time_min"].to_numpy(dtype=np.float64).copy()
+    values[0] = 0.0
+    visit_time[0] = 0.0
+    return values, visit_time
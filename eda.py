@@ -1,8 +1,11 @@
 from __future__ import annotations
+import io
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, List
+
+PLOT_NAMES = ("hist_duration", "hist_cost", "box_weather_satisfaction", "box_traffic_duration")
 
 def eda_summary(df: pd.DataFrame) -> Dict[str, Any]:
     num_df = df.select_dtypes(include=["number"])
@@ -14,31 +17,48 @@ def eda_summary(df: pd.DataFrame) -> Dict[str, Any]:
     }
     return summary
 
-def eda_plots(df: pd.DataFrame, outdir: str = "eda_outputs") -> Tuple[str, str, str, str]:
-    import os
-    os.makedirs(outdir, exist_ok=True)
-    p1 = f"{outdir}/hist_duration.png"
-    plt.figure()
+def _eda_figures(df: pd.DataFrame):
+    # gera as figuras uma a uma; quem consome decide se salva em disco ou em memória
+    fig = plt.figure()
     df["Total_Duration"].plot(kind="hist", bins=20)
     plt.title("Distribuição da Duração Total")
     plt.xlabel("min")
     plt.ylabel("freq")
-    plt.tight_layout(); plt.savefig(p1); plt.close()
-    p2 = f"{outdir}/hist_cost.png"
-    plt.figure()
+    plt.tight_layout()
+    yield fig
+    fig = plt.figure()
     df["Total_Cost"].plot(kind="hist", bins=20)
     plt.title("Distribuição de Custo Total")
     plt.xlabel("custo")
     plt.ylabel("freq")
-    plt.tight_layout(); plt.savefig(p2); plt.close()
-    p3 = f"{outdir}/box_weather_satisfaction.png"
-    plt.figure()
+    plt.tight_layout()
+    yield fig
+    fig = plt.figure()
     sns.boxplot(x="Weather", y="Satisfaction_Score", data=df)
     plt.title("Satisfação por Clima")
-    plt.tight_layout(); plt.savefig(p3); plt.close()
-    p4 = f"{outdir}/box_traffic_duration.png"
-    plt.figure()
+    plt.tight_layout()
+    yield fig
+    fig = plt.figure()
     sns.boxplot(x="Traffic_Level", y="Total_Duration", data=df)
     plt.title("Duração por Tráfego")
-    plt.tight_layout(); plt.savefig(p4); plt.close()
-    return p1, p2, p3, p4
+    plt.tight_layout()
+    yield fig
+
+def eda_plots(df: pd.DataFrame, outdir: str = "eda_outputs") -> Tuple[str, str, str, str]:
+    import os
+    os.makedirs(outdir, exist_ok=True)
+    paths = []
+    for name, fig in zip(PLOT_NAMES, _eda_figures(df)):
+        p = f"{outdir}/{name}.png"
+        fig.savefig(p); plt.close(fig)
+        paths.append(p)
+    return tuple(paths)
+
+def eda_plot_images(df: pd.DataFrame) -> List[bytes]:
+    # mesmas figuras de eda_plots, como PNG em memória (sem tocar o disco)
+    out = []
+    for fig in _eda_figures(df):
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png"); plt.close(fig)
+        out.append(buf.getvalue())
+    return out
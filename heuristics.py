@@ -1,13 +1,19 @@
 
 from __future__ import annotations
+import time
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Sequence, Tuple
 
 def greedy_itinerary(values: np.ndarray, visit_time: np.ndarray,
-                     T: np.ndarray, time_limit: float) -> Dict:
- 
+                     T: np.ndarray, time_limit: float,
+                     candidates: List[np.ndarray] | None = None,
+                     exclude: Sequence[int] | None = None) -> Dict:
+    # `candidates[cur]` (ver spatial.knn_candidates) restringe os próximos POIs avaliados a partir de cur;
+    # POIs em `exclude` nunca entram na rota
     n = len(values)
     remaining = set(range(1, n))
+    if exclude is not None:
+        remaining.difference_update(int(j) for j in exclude)
     route = [0]
     total_value = 0.0
     total_time = 0.0
@@ -17,7 +23,8 @@ def greedy_itinerary(values: np.ndarray, visit_time: np.ndarray,
         best, best_ratio = None, -1.0
         best_incr_time, best_next = None, None
 
-        for j in list(remaining):
+        scan = list(remaining) if candidates is None else [j for j in candidates[cur].tolist() if j in remaining]
+        for j in scan:
     
             incr = T[cur, j] + visit_time[j] + T[j, 0]
             ratio = values[j] / (incr + 1e-9)
@@ -43,3 +50,115 @@ def greedy_itinerary(values: np.ndarray, visit_time: np.ndarray,
     total_time += T[route[-1], 0]
     route.append(0)
     return {"route": route, "total_value": float(total_value), "total_time": float(total_time)}
+
+def _route_time(route: np.ndarray, visit_time: np.ndarray, T: np.ndarray) -> float:
+    return float(T[route[:-1], route[1:]].sum() + visit_time[route].sum())
+
+def _best_insertion(route, unvisited, values, visit_time, T, slack):
+    # insere o POI não visitado de maior valor que cabe na folga, na posição mais barata
+    cand = unvisited[values[unvisited] > 0]
+    if cand.size == 0:
+        return None
+    a, b = route[:-1], route[1:]
+    delta = T[np.ix_(a, cand)] + visit_time[cand] + T[np.ix_(cand, b)].T - T[a, b][:, None]
+    delta = np.where(delta <= slack + 1e-9, delta, np.inf)
+    pos = delta.argmin(axis=0)
+    d = delta[pos, np.arange(cand.size)]
+    ok = np.isfinite(d)
+    if not ok.any():
+        return None
+    u = np.lexsort((d[ok], -values[cand[ok]]))[0]
+    j, p = int(cand[ok][u]), int(pos[ok][u])
+    return np.concatenate([route[:p + 1], [j], route[p + 1:]])
+
+def _best_swap(route, unvisited, values, visit_time, T, slack):
+    # troca um POI da rota por um de fora: mais valor, ou mesmo valor em menos tempo
+    if route.size <= 2 or unvisited.size == 0:
+        return None
+    prev, cur, nxt = route[:-2], route[1:-1], route[2:]
+    out = T[prev, cur] + visit_time[cur] + T[cur, nxt]
+    inn = T[np.ix_(prev, unvisited)] + visit_time[unvisited] + T[np.ix_(unvisited, nxt)].T
+    delta = inn - out[:, None]
+    gain = values[unvisited][None, :] - values[cur][:, None]
+    better = ((gain > 1e-9) | ((np.abs(gain) <= 1e-9) & (delta < -1e-9))) & (delta <= slack + 1e-9)
+    if not better.any():
+        return None
+    score = np.where(better, gain - 1e-9 * delta, -np.inf)
+    p, u = np.unravel_index(int(score.argmax()), score.shape)
+    new = route.copy()
+    new[p + 1] = unvisited[u]
+    return new
+
+def _best_two_opt(route, T):
+    # inverte route[i..k]; somas prefixadas nos dois sentidos dão o delta em O(1) mesmo com T assimétrica
+    m = route.size
+    if m < 4:
+        return None
+    fwd = np.concatenate([[0.0], np.cumsum(T[route[:-1], route[1:]])])
+    bwd = np.concatenate([[0.0], np.cumsum(T[route[1:], route[:-1]])])
+    i, k = np.triu_indices(m - 1, k=1)
+    keep = i >= 1
+    i, k = i[keep], k[keep]
+    delta = (T[route[i - 1], route[k]] + T[route[i], route[k + 1]]
+             - T[route[i - 1], route[i]] - T[route[k], route[k + 1]]
+             + (bwd[k] - bwd[i]) - (fwd[k] - fwd[i]))
+    best = int(delta.argmin())
+    if delta[best] >= -1e-9:
+        return None
+    a, b = int(i[best]), int(k[best])
+    return np.concatenate([route[:a], route[a:b + 1][::-1], route[b + 1:]])
+
+def _best_or_opt(route, T, max_len: int = 3):
+    # move um segmento de até max_len POIs (sem inverter) para a aresta mais barata
+    m = route.size
+    best, best_delta = None, -1e-9
+    for s in range(1, max_len + 1):
+        for i in range(1, m - s):
+            seg_first, seg_last = route[i], route[i + s - 1]
+            before, after = route[i - 1], route[i + s]
+            removed = T[before, seg_first] + T[seg_last, after] - T[before, after]
+            rest = np.concatenate([route[:i], route[i + s:]])
+            a, b = rest[:-1], rest[1:]
+            add = T[a, seg_first] + T[seg_last, b] - T[a, b]
+            add[i - 1] = np.inf  # posição original
+            j = int(add.argmin())
+            delta = add[j] - removed
+            if delta < best_delta:
+                best_delta = delta
+                best = np.concatenate([rest[:j + 1], route[i:i + s], rest[j + 1:]])
+    return best
+
+def improve_itinerary(values: np.ndarray, visit_time: np.ndarray, T: np.ndarray,
+                      time_limit: float, route: List[int] | None = None,
+                      time_budget_sec: float = 1.0) -> Dict:
+    # busca local "anytime" a partir da gulosa (ou de `route`): inserção e troca aumentam o
+    # valor, 2-opt e or-opt reduzem o tempo e abrem folga para novas inserções
+    t0 = time.time()
+    values = np.asarray(values, dtype=np.float64)
+    visit_time = np.asarray(visit_time, dtype=np.float64)
+    T = np.asarray(T, dtype=np.float64)
+    n = len(values)
+    if route is None:
+        route = greedy_itinerary(values, visit_time, T, time_limit)["route"]
+    route = np.asarray(route, dtype=np.int64)
+    total_time = _route_time(route, visit_time, T)
+
+    while time.time() - t0 < time_budget_sec:
+        in_route = np.zeros(n, dtype=bool)
+        in_route[route] = True
+        unvisited = np.flatnonzero(~in_route)
+        slack = time_limit - total_time
+        new = _best_insertion(route, unvisited, values, visit_time, T, slack)
+        if new is None:
+            new = _best_swap(route, unvisited, values, visit_time, T, slack)
+        if new is None:
+            new = _best_two_opt(route, T)
+        if new is None:
+            new = _best_or_opt(route, T)
+        if new is None:
+            break
+        route = new
+        total_time = _route_time(route, visit_time, T)
+
+    return {"route": route.tolist(), "total_value": float(values[route[1:-1]].sum()),
+            "total_time": float(total_time)}
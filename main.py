@@ -1,9 +1,10 @@
 import argparse
 import pandas as pd
-from data_prep import load_dynamic_csv, clean_dynamic
+from data_prep import load_dynamic_csv, clean_dynamic, load_dynamic_clean, sample_dynamic_csv, ConstraintIndex
 from eda import eda_summary, eda_plots
-from model import train_and_eval, feature_importance
-from recommender import recommend
+from model import importance_report
+from model_store import load_or_train, DEFAULT_CACHE_DIR
+from recommender import recommend, recommend_stream
 
 def parse_args():
     p = argparse.ArgumentParser()
@@ -18,25 +19,50 @@ def parse_args():
     p.add_argument("--theme", type=str, default=None)
     p.add_argument("--transport", type=str, default=None)
     p.add_argument("--top-k", type=int, default=10)
+    p.add_argument("--model-cache", type=str, default=DEFAULT_CACHE_DIR)
+    p.add_argument("--retrain", action="store_true")
+    p.add_argument("--fast-ingest", action="store_true")
+    p.add_argument("--stream", action="store_true")
+    p.add_argument("--chunksize", type=int, default=100_000)
+    p.add_argument("--train-rows", type=int, default=200_000)
+    p.add_argument("--backend", type=str, default="rf", choices=["rf", "rf_capped", "hgb", "ridge", "auto"])
+    p.add_argument("--backend-tolerance", type=float, default=0.05)
+    p.add_argument("--importance", type=str, default="subsample", choices=["subsample", "impurity", "full"])
     return p.parse_args()
 
 def main():
     args = parse_args()
-    raw = load_dynamic_csv(args.csv)
-    df = clean_dynamic(raw)
+    if args.stream:
+        # EDA e treino numa amostra; as recomendações varrem o arquivo inteiro em blocos
+        df = clean_dynamic(sample_dynamic_csv(args.csv, args.train_rows, args.chunksize))
+    elif args.fast_ingest:
+        df = load_dynamic_clean(args.csv)
+    else:
+        raw = load_dynamic_csv(args.csv)
+        df = clean_dynamic(raw)
     summary = eda_summary(df)
     print("=== EDA ===")
     print(summary)
     eda_plots(df)
-    tr = train_and_eval(df)
+    tr = load_or_train(df, cache_dir=args.model_cache, force=args.retrain, backend=args.backend, tolerance=args.backend_tolerance)
     print("=== Métricas ===")
     print(tr["metrics"])
-    imp = feature_importance(tr["model"], tr["X_test"], tr["y_test"])
-    print("=== Importância de Atributos (permutation) ===")
-    print(imp.head(15).to_string(index=False))
+    if "backend_table" in tr:
+        print(tr["backend_table"].to_string(index=False))
+    method = args.importance
+    if method == "impurity" and not hasattr(tr["model"][-1], "feature_importances_"):
+        # hgb/ridge (inclusive quando escolhidos pelo auto) não têm importância nativa
+        print(f"Backend {tr['metrics']['backend']} não expõe importância por impureza; usando subsample.")
+        method = "subsample"
+    rep = importance_report(tr["model"], tr["X_test"], tr["y_test"], method=method)
+    print(f"=== Importância de Atributos ({rep['method']}, {rep['runtime_sec']:.2f}s) ===")
+    print(rep["table"].head(15).to_string(index=False))
     constraints = {"max_duration": args.max_duration, "max_cost": args.max_cost, "budget": args.budget}
     overrides = {"Weather": args.weather, "Traffic_Level": args.traffic, "Crowd_Density": args.crowd, "Event_Impact": args.event, "Preferred_Theme": args.theme, "Preferred_Transport": args.transport}
-    rec = recommend(df, tr["model"], constraints, overrides, top_k=args.top_k)
+    if args.stream:
+        rec = recommend_stream(args.csv, tr["model"], constraints, overrides, top_k=args.top_k, chunksize=args.chunksize)
+    else:
+        rec = recommend(df, tr["model"], constraints, overrides, top_k=args.top_k, index=ConstraintIndex(df))
     if len(rec):
         rec.to_csv("recommendations.csv", index=False, encoding="utf-8")
         print("=== Recomendações ===")
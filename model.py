@@ -1,33 +1,108 @@
 from __future__ import annotations
+import os
+import time
+import tempfile
+import joblib
 import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.pipeline import Pipeline
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from sklearn.linear_model import Ridge
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import r2_score, mean_absolute_error
 from sklearn.inspection import permutation_importance
 from data_prep import CATS, NUMS, split_features
 
-def build_model(random_state: int = 42) -> Pipeline:
+def _rf(random_state: int):
+    return RandomForestRegressor(n_estimators=300, max_depth=None, random_state=random_state, n_jobs=-1)
+
+def _rf_capped(random_state: int):
+    return RandomForestRegressor(n_estimators=100, max_depth=12, min_samples_leaf=2, random_state=random_state, n_jobs=-1)
+
+def _hgb(random_state: int):
+    return HistGradientBoostingRegressor(max_iter=200, learning_rate=0.05, random_state=random_state)
+
+def _ridge(random_state: int):
+    return Ridge(alpha=1.0)
+
+BACKENDS = {"rf": _rf, "rf_capped": _rf_capped, "hgb": _hgb, "ridge": _ridge}
+
+def build_model(random_state: int = 42, backend: str = "rf") -> Pipeline:
+    if backend not in BACKENDS:
+        raise ValueError(f"backend desconhecido: {backend}")
     pre = ColumnTransformer([
         ("num", StandardScaler(), NUMS),
         ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), CATS)
     ])
-    rf = RandomForestRegressor(n_estimators=300, max_depth=None, random_state=random_state, n_jobs=-1)
-    pipe = Pipeline([("pre", pre), ("rf", rf)])
+    pipe = Pipeline([("pre", pre), ("reg", BACKENDS[backend](random_state))])
     return pipe
 
-def train_and_eval(df: pd.DataFrame, test_size: float = 0.2, random_state: int = 42) -> Dict[str, Any]:
+def _model_bytes(model: Pipeline) -> int:
+    # tamanho serializado via joblib num arquivo temporário: os arrays das árvores vão direto
+    # para o disco, sem montar o pickle inteiro em memória
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "model.joblib")
+        joblib.dump(model, path)
+        return os.path.getsize(path)
+
+def _serving_cost(model: Pipeline, X: pd.DataFrame) -> Dict[str, float]:
+    # latência de predict por 10k linhas (X replicado) e tamanho serializado. Só roda no
+    # benchmark_backends ou com train_and_eval(serving_cost=True): a réplica densa pesa
+    reps = int(np.ceil(10_000 / max(len(X), 1)))
+    X10k = pd.concat([X] * reps, ignore_index=True).head(10_000)
+    t0 = time.perf_counter()
+    model.predict(X10k)
+    latency = (time.perf_counter() - t0) * 1000
+    return {"predict_ms_per_10k": float(latency), "model_bytes": _model_bytes(model)}
+
+def benchmark_backends(X_train: pd.DataFrame, y_train: pd.Series, X_test: pd.DataFrame, y_test: pd.Series,
+                       backends: List[str] | None = None, random_state: int = 42) -> Tuple[pd.DataFrame, Dict[str, Pipeline]]:
+    rows, models = [], {}
+    for name in backends or list(BACKENDS):
+        model = build_model(random_state, name)
+        t0 = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_sec = time.perf_counter() - t0
+        y_pred = model.predict(X_test)
+        rows.append({"backend": name, "r2": float(r2_score(y_test, y_pred)), "mae": float(mean_absolute_error(y_test, y_pred)),
+                     "fit_sec": fit_sec, **_serving_cost(model, X_test)})
+        models[name] = model
+    return pd.DataFrame(rows), models
+
+def select_backend(table: pd.DataFrame, tolerance: float = 0.05) -> str:
+    # o mais rápido entre os que ficam a até `tolerance` (relativo) do melhor MAE
+    ok = table[table["mae"] <= table["mae"].min() * (1 + tolerance)]
+    return str(ok.sort_values(["predict_ms_per_10k", "model_bytes"]).iloc[0]["backend"])
+
+def train_and_eval(df: pd.DataFrame, test_size: float = 0.2, random_state: int = 42,
+                   backend: str = "rf", tolerance: float = 0.05, serving_cost: bool = False) -> Dict[str, Any]:
+    # `serving_cost` mede latência de predict em 10k linhas; no "auto" ela já vem da tabela
     X, y = split_features(df)
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
-    model = build_model(random_state)
-    model.fit(X_train, y_train)
+    out: Dict[str, Any] = {}
+    if backend == "auto":
+        table, models = benchmark_backends(X_train, y_train, X_test, y_test, random_state=random_state)
+        backend = select_backend(table, tolerance)
+        model = models[backend]
+        out["backend_table"] = table
+    else:
+        model = build_model(random_state, backend)
+        model.fit(X_train, y_train)
     y_pred = model.predict(X_test)
-    metrics = {"r2": float(r2_score(y_test, y_pred)), "mae": float(mean_absolute_error(y_test, y_pred))}
-    return {"model": model, "X_test": X_test, "y_test": y_test, "y_pred": y_pred, "metrics": metrics}
+    metrics = {"r2": float(r2_score(y_test, y_pred)), "mae": float(mean_absolute_error(y_test, y_pred)),
+               "backend": backend}
+    if "backend_table" in out:
+        row = out["backend_table"].set_index("backend").loc[backend]
+        metrics.update(predict_ms_per_10k=float(row["predict_ms_per_10k"]), model_bytes=int(row["model_bytes"]))
+    elif serving_cost:
+        metrics.update(_serving_cost(model, X_test))
+    else:
+        metrics["model_bytes"] = _model_bytes(model)
+    out.update({"model": model, "X_test": X_test, "y_test": y_test, "y_pred": y_pred, "metrics": metrics})
+    return out
 
 def feature_importance(model: Pipeline, X: pd.DataFrame, y: pd.Series, n_repeats: int = 5) -> pd.DataFrame:
     r = permutation_importance(model, X, y, n_repeats=n_repeats, random_state=42, n_jobs=-1, scoring="r2")
@@ -42,3 +117,119 @@ def score_routes(model: Pipeline, base_df: pd.DataFrame, user_inputs: Dict[str,
     Xg = g[NUMS + CATS]
     preds = model.predict(Xg)
     return preds
+
+def score_routes_batch(model: Pipeline, base_df: pd.DataFrame, user_inputs: List[Dict[str, Any]],
+                       out: np.ndarray | None = None) -> np.ndarray:
+    # transforma o pool uma vez e, por cenário, reescreve só os blocos one-hot sobrescritos
+    # nesse mesmo buffer, prediz e restaura: memória de um pool codificado, não de n_cenarios.
+    # `out` (n_cenarios, n_rotas) recebe os scores direto (ex.: matriz float32 do cache)
+    pre, est = model[0], model[-1]
+    n_routes = len(base_df)
+    if out is None:
+        out = np.empty((len(user_inputs), n_routes))
+    if not user_inputs or n_routes == 0:
+        return out
+    Xt = np.asarray(pre.transform(base_df[NUMS + CATS]), dtype=np.float64)
+    enc = pre.named_transformers_["cat"]
+    cat_start = pre.output_indices_["cat"].start
+    sizes = [len(c) for c in enc.categories_]
+    offsets = cat_start + np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(int)
+    blocks = {c: (int(offsets[i]), sizes[i], list(enc.categories_[i])) for i, c in enumerate(CATS)}
+
+    for s, inputs in enumerate(user_inputs):
+        overrides = {k: v for k, v in inputs.items() if k in base_df.columns and v is not None}
+        if any(k not in blocks for k in overrides):
+            # override numérico: cai no caminho completo para este cenário
+            g = base_df.copy()
+            for k, v in overrides.items():
+                g[k] = v
+            out[s] = est.predict(pre.transform(g[NUMS + CATS]))
+            continue
+        saved = []
+        for k, v in overrides.items():
+            start, size, cats = blocks[k]
+            saved.append((start, Xt[:, start:start + size].copy()))
+            Xt[:, start:start + size] = 0.0
+            if v in cats:  # valor desconhecido: bloco zerado, como handle_unknown="ignore"
+                Xt[:, start + cats.index(v)] = 1.0
+        out[s] = est.predict(Xt)
+        for start, block in reversed(saved):
+            Xt[:, start:start + block.shape[1]] = block
+    return out
+
+def _feature_groups(model: Pipeline) -> List[str]:
+    # coluna de entrada de cada coluna de saída do pré-processamento (blocos one-hot -> feature CATS)
+    pre = model[0]
+    groups = list(NUMS)
+    enc = pre.named_transformers_["cat"]
+    for c, cats in zip(CATS, enc.categories_):
+        groups += [c] * len(cats)
+    return groups
+
+def _ci_width(drops: List[float]) -> float:
+    return float(2 * 1.96 * np.std(drops, ddof=1) / np.sqrt(len(drops))) if len(drops) > 1 else float("inf")
+
+def _buffer_permutation(model: Pipeline, X: pd.DataFrame, y: np.ndarray, min_repeats: int,
+                        max_repeats: int, ci_tol: float, random_state: int) -> Dict[str, List[float]]:
+    # como em score_routes_batch: X é codificado uma vez e, por feature, só o bloco dela é
+    # permutado nesse mesmo buffer, predito e restaurado (memória de uma amostra codificada,
+    # não de uma cópia por feature). Uma feature sai quando o IC fica estreito
+    pre, est = model[0], model[-1]
+    rng = np.random.default_rng(random_state)
+    Xt = np.asarray(pre.transform(X[NUMS + CATS]), dtype=np.float64)
+    groups = np.array(_feature_groups(model))
+    blocks = {}
+    for c in X.columns:
+        idx = np.flatnonzero(groups == c)  # bloco contíguo (one-hot inteiro para CATS)
+        blocks[c] = slice(int(idx[0]), int(idx[-1]) + 1)
+    base = r2_score(y, est.predict(Xt))
+    drops: Dict[str, List[float]] = {c: [] for c in X.columns}
+    active = list(X.columns)
+    n = len(X)
+    for r in range(max_repeats):
+        if not active:
+            break
+        for c in active:
+            sl = blocks[c]
+            saved = Xt[:, sl].copy()
+            Xt[:, sl] = saved[rng.permutation(n)]
+            drops[c].append(base - r2_score(y, est.predict(Xt)))
+            Xt[:, sl] = saved
+        if r + 1 >= min_repeats:
+            active = [c for c in active if _ci_width(drops[c]) > ci_tol]
+    return drops
+
+def importance_report(model: Pipeline, X: pd.DataFrame, y: pd.Series, method: str = "subsample",
+                      max_rows: int = 2000, min_repeats: int = 3, max_repeats: int = 10,
+                      ci_tol: float = 0.01, random_state: int = 42) -> Dict[str, Any]:
+    # "subsample": permutação por coluna de entrada (CATS inteiras, não cada one-hot) numa amostra
+    # estratificada, parando cada feature quando a largura do IC 95% fica <= ci_tol.
+    # "impurity": importâncias nativas da árvore somadas por feature (custo zero).
+    # "full": permutation_importance original (feature_importance)
+    t0 = time.time()
+    if method == "impurity":
+        est = model[-1]
+        if not hasattr(est, "feature_importances_"):
+            raise ValueError("o regressor não expõe feature_importances_")
+        imp = pd.Series(est.feature_importances_, index=_feature_groups(model)).groupby(level=0).sum()
+        table = pd.DataFrame({"feature": imp.index, "importance": imp.values, "ci_width": np.nan, "repeats": 0})
+        rows = 0
+    elif method == "full":
+        table = feature_importance(model, X, y, n_repeats=max_repeats)
+        table = table.assign(ci_width=np.nan, repeats=max_repeats)
+        rows = len(X)
+    elif method == "subsample":
+        Xs, ys = X, y
+        if len(X) > max_rows:
+            counts = y.value_counts()
+            stratify = y if counts.min() >= 2 and len(counts) <= max_rows // 2 else None
+            Xs, _, ys, _ = train_test_split(X, y, train_size=max_rows, stratify=stratify, random_state=random_state)
+        drops = _buffer_permutation(model, Xs, np.asarray(ys), min_repeats, max_repeats, ci_tol, random_state)
+        table = pd.DataFrame({"feature": list(drops), "importance": [float(np.mean(d)) for d in drops.values()],
+                              "ci_width": [_ci_width(d) for d in drops.values()],
+                              "repeats": [len(d) for d in drops.values()]})
+        rows = len(Xs)
+    else:
+        raise ValueError(f"method desconhecido: {method}")
+    table = table.sort_values("importance", ascending=False).reset_index(drop=True)
+    return {"table": table, "method": method, "rows": rows, "runtime_sec": time.time() - t0}
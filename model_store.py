@@ -0,0 +1,49 @@
+from __future__ import annotations
+import os
+import json
+import hashlib
+import joblib
+import pandas as pd
+from typing import Dict, Any
+from data_prep import CATS, NUMS, TARGET
+from model import build_model, train_and_eval, BACKENDS
+
+DEFAULT_CACHE_DIR = ".model_cache"
+
+def dataset_fingerprint(df: pd.DataFrame, **train_kwargs) -> str:
+    # hash do conteúdo usado no treino + hiperparâmetros escalares do pipeline
+    h = hashlib.sha256()
+    cols = [c for c in NUMS + CATS + [TARGET] if c in df.columns]
+    h.update(pd.util.hash_pandas_object(df[cols], index=False).values.tobytes())
+    backend = train_kwargs.get("backend", "rf")
+    params = build_model(train_kwargs.get("random_state", 42), backend if backend in BACKENDS else "rf").get_params()
+    params = {k: v for k, v in params.items() if isinstance(v, (int, float, str, bool, type(None)))}
+    h.update(json.dumps({"params": params, "train": train_kwargs}, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()[:32]
+
+def _evict(cache_dir: str, max_entries: int) -> None:
+    # LRU pelo mtime: cada leitura "toca" o arquivo
+    files = [os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith(".joblib")]
+    files.sort(key=os.path.getmtime, reverse=True)
+    for f in files[max_entries:]:
+        os.remove(f)
+
+def load_or_train(df: pd.DataFrame, cache_dir: str = DEFAULT_CACHE_DIR, force: bool = False,
+                  max_entries: int = 5, **train_kwargs) -> Dict[str, Any]:
+    os.makedirs(cache_dir, exist_ok=True)
+    key = dataset_fingerprint(df, **train_kwargs)
+    path = os.path.join(cache_dir, f"{key}.joblib")
+    if not force and os.path.exists(path):
+        tr = joblib.load(path)
+        os.utime(path)
+        tr["cache_hit"] = True
+        tr["fingerprint"] = key
+        return tr
+    tr = train_and_eval(df, **train_kwargs)
+    tmp = f"{path}.tmp"
+    joblib.dump(tr, tmp)
+    os.replace(tmp, path)
+    _evict(cache_dir, max_entries)
+    tr["cache_hit"] = False
+    tr["fingerprint"] = key
+    return tr
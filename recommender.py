@@ -1,29 +1,110 @@
 from __future__ import annotations
+import bisect
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Tuple
-from data_prep import filter_constraints, to_recommendation_table
-from model import score_routes
+from typing import Dict, Any, Tuple, List
+from data_prep import filter_constraints, to_recommendation_table, clean_dynamic, iter_dynamic_csv, ConstraintIndex
+from model import score_routes, score_routes_batch
 
-def recommend(df: pd.DataFrame, model, constraints: Dict[str, Any], user_overrides: Dict[str, Any], top_k: int = 10) -> pd.DataFrame:
-    pool = filter_constraints(df, constraints.get("max_duration"), constraints.get("max_cost"), constraints.get("budget"))
+def recommend(df: pd.DataFrame, model, constraints: Dict[str, Any], user_overrides: Dict[str, Any], top_k: int | None = 10, index: ConstraintIndex | None = None, score_cache=None) -> pd.DataFrame:
+    pool = filter_constraints(df, constraints.get("max_duration"), constraints.get("max_cost"), constraints.get("budget"), index=index)
     if len(pool) == 0:
         return pd.DataFrame()
-    preds = score_routes(model, pool, user_overrides)
+    preds = score_cache.scores_for(user_overrides, pool.index) if score_cache is not None else None
+    if preds is None:
+        preds = score_routes(model, pool, user_overrides)
     rec = to_recommendation_table(pool, preds)
-    rec = rec.head(top_k)
+    if top_k is not None:
+        rec = rec.head(top_k)
     return rec
 
+def recommend_batch(df: pd.DataFrame, model, constraints: Dict[str, Any], user_overrides: List[Dict[str, Any]], top_k: int = 10, index: ConstraintIndex | None = None) -> List[pd.DataFrame]:
+    pool = filter_constraints(df, constraints.get("max_duration"), constraints.get("max_cost"), constraints.get("budget"), index=index)
+    if len(pool) == 0:
+        return [pd.DataFrame() for _ in user_overrides]
+    preds = score_routes_batch(model, pool, user_overrides)
+    k = min(top_k, len(pool))
+    out = []
+    for p in preds:
+        top = np.argpartition(-p, k - 1)[:k]
+        out.append(to_recommendation_table(pool.iloc[top], p[top]).head(top_k))
+    return out
+
+def recommend_stream(path: str, model, constraints: Dict[str, Any], user_overrides: Dict[str, Any], top_k: int = 10, chunksize: int = 100_000) -> pd.DataFrame:
+    # limpa, filtra e pontua o CSV em blocos; só as top_k melhores linhas sobrevivem entre blocos
+    best = pd.DataFrame()
+    for chunk in iter_dynamic_csv(path, chunksize):
+        pool = filter_constraints(clean_dynamic(chunk), constraints.get("max_duration"), constraints.get("max_cost"), constraints.get("budget"))
+        if len(pool) == 0:
+            continue
+        preds = score_routes(model, pool, user_overrides)
+        k = min(top_k, len(pool))
+        top = np.argpartition(-preds, k - 1)[:k]
+        rec = to_recommendation_table(pool.iloc[top], preds[top])
+        best = rec if len(best) == 0 else pd.concat([best, rec])
+        best = best.sort_values("Predicted_Satisfaction", ascending=False, kind="stable").head(top_k)
+    return best
+
+def _skyline_2d(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    # ordena por (x, y); p é dominado se algum x estritamente menor tem y <= p.y,
+    # ou se no mesmo x existe y estritamente menor
+    order = np.lexsort((y, x))
+    xs, ys = x[order], y[order]
+    starts = np.flatnonzero(np.r_[True, xs[1:] != xs[:-1]])
+    group = np.cumsum(np.r_[True, xs[1:] != xs[:-1]]) - 1
+    group_min = np.minimum.reduceat(ys, starts)
+    before = np.r_[np.inf, np.minimum.accumulate(group_min)[:-1]]
+    dominated = (before[group] <= ys) | (group_min[group] < ys)
+    mask = np.empty(len(x), dtype=bool)
+    mask[order] = ~dominated
+    return mask
+
+def _skyline_3d(x: np.ndarray, y: np.ndarray, s: np.ndarray) -> np.ndarray:
+    # varredura em x crescente mantendo a escada 2-D (y crescente, s crescente) dos pontos com
+    # x estritamente menor: p é dominado se o último degrau com y <= p.y tem s >= p.s.
+    # Empates em x são resolvidos dentro do grupo com o skyline 2-D em (y, -s)
+    order = np.lexsort((-s, y, x))
+    yo, so = y[order], s[order]
+    xs, ys, ss = x[order].tolist(), yo.tolist(), so.tolist()
+    keep = np.zeros(len(xs), dtype=bool)
+    stair_y: List[float] = []
+    stair_s: List[float] = []
+    start = 0
+    while start < len(xs):
+        end = start + 1
+        while end < len(xs) and xs[end] == xs[start]:
+            end += 1
+        alive = []
+        for p in range(start, end):
+            k = bisect.bisect_right(stair_y, ys[p]) - 1
+            if k < 0 or stair_s[k] < ss[p]:
+                alive.append(p)
+        if len(alive) > 1:
+            sub = np.array(alive)
+            alive = sub[_skyline_2d(yo[sub], -so[sub])].tolist()
+        for p in alive:
+            keep[p] = True
+            pos = bisect.bisect_left(stair_y, ys[p])
+            stop = pos
+            while stop < len(stair_y) and stair_s[stop] <= ss[p]:
+                stop += 1
+            stair_y[pos:stop] = [ys[p]]
+            stair_s[pos:stop] = [ss[p]]
+        start = end
+    mask = np.empty(len(xs), dtype=bool)
+    mask[order] = keep
+    return mask
+
+def pareto_mask(df: pd.DataFrame, x_col: str = "Total_Cost", y_col: str = "Total_Duration", score_col: str | None = "Predicted_Satisfaction") -> np.ndarray:
+    # True para rotas não dominadas: minimiza x_col e y_col e, se dado, maximiza score_col
+    x = df[x_col].to_numpy(dtype=np.float64)
+    y = df[y_col].to_numpy(dtype=np.float64)
+    if len(df) == 0:
+        return np.zeros(0, dtype=bool)
+    if score_col is None:
+        return _skyline_2d(x, y)
+    return _skyline_3d(x, y, df[score_col].to_numpy(dtype=np.float64))
+
 def pareto_frontier(df: pd.DataFrame, x_col: str = "Total_Cost", y_col: str = "Total_Duration", score_col: str = "Predicted_Satisfaction") -> Tuple[pd.DataFrame, pd.DataFrame]:
-    g = df[[x_col, y_col, score_col]].copy()
-    g = g.sort_values([x_col, y_col])
-    frontier = []
-    best_score = -np.inf
-    for _, row in g.iterrows():
-        if row[score_col] > best_score:
-            frontier.append(row)
-            best_score = row[score_col]
-    frontier_df = pd.DataFrame(frontier)
-    dominated = pd.merge(df, frontier_df, on=[x_col, y_col, score_col], how="left", indicator=True)
-    dominated = dominated[dominated["_merge"] == "left_only"].drop(columns=["_merge"])
-    return frontier_df, dominated
+    mask = pareto_mask(df, x_col, y_col, score_col)
+    return df[mask].sort_values([x_col, y_col]), df[~mask]
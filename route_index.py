@@ -0,0 +1,82 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from typing import Dict, Any
+from data_prep import parse_route_sequences
+
+class RouteIndex:
+    # índices esparsos sobre as rotas em layout CSR (flat + offsets):
+    # incidência rota×POI, transições POI→POI, coocorrência POI×POI e índice invertido POI→rotas
+    __slots__ = ("flat", "offsets", "n_pois", "incidence", "by_poi", "transitions", "cooccurrence")
+
+    def __init__(self, flat: np.ndarray, offsets: np.ndarray, n_pois: int | None = None):
+        self.flat = flat
+        self.offsets = offsets
+        self.n_pois = int(n_pois if n_pois is not None else (flat.max() + 1 if flat.size else 0))
+        n_routes = len(offsets) - 1
+        lengths = np.diff(offsets)
+        route_of = np.repeat(np.arange(n_routes), lengths)
+
+        inc = sp.csr_matrix((np.ones(flat.size, dtype=np.float32), (route_of, flat)), shape=(n_routes, self.n_pois))
+        inc.data[:] = 1.0  # POI repetido na mesma rota conta uma vez
+        self.incidence = inc
+        self.by_poi = inc.tocsc()
+
+        same_route = route_of[:-1] == route_of[1:]
+        src, dst = flat[:-1][same_route], flat[1:][same_route]
+        self.transitions = sp.csr_matrix((np.ones(src.size, dtype=np.float32), (src, dst)),
+                                         shape=(self.n_pois, self.n_pois))
+        self.cooccurrence = (inc.T @ inc).tocsr()
+
+    def route(self, i: int) -> np.ndarray:
+        return self.flat[self.offsets[i]:self.offsets[i + 1]]
+
+    def routes_with(self, poi: int) -> np.ndarray:
+        # posições das rotas que passam por `poi`
+        if poi < 0 or poi >= self.n_pois:
+            return np.empty(0, dtype=np.int32)
+        return self.by_poi.indices[self.by_poi.indptr[poi]:self.by_poi.indptr[poi + 1]]
+
+    def routes_with_all(self, pois) -> np.ndarray:
+        lists = sorted((self.routes_with(p) for p in pois), key=len)
+        if not lists:
+            return np.arange(len(self.offsets) - 1)
+        out = lists[0]
+        for other in lists[1:]:
+            out = np.intersect1d(out, other, assume_unique=True)
+        return out
+
+    def similar_routes(self, i: int, top_k: int = 10) -> pd.DataFrame:
+        # Jaccard entre o conjunto de POIs da rota i e as demais
+        inter = np.asarray((self.incidence @ self.incidence[i].T).todense()).ravel()
+        sizes = np.asarray(self.incidence.sum(axis=1)).ravel()
+        union = sizes + sizes[i] - inter
+        jac = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        jac[i] = -1.0
+        k = min(top_k, len(jac) - 1)
+        if k <= 0:
+            return pd.DataFrame({"route": [], "jaccard": []})
+        top = np.argpartition(-jac, k - 1)[:k]
+        top = top[np.argsort(-jac[top], kind="stable")]
+        return pd.DataFrame({"route": top, "jaccard": jac[top]})
+
+    def poi_values(self, scores: np.ndarray | None = None, min_routes: int = 1) -> np.ndarray:
+        # valor por POI para os solvers: média do score das rotas que passam por ele
+        # (ou a frequência, sem scores); POIs com menos de min_routes rotas ficam com 0
+        counts = np.asarray(self.by_poi.sum(axis=0)).ravel()
+        if scores is None:
+            vals = counts.astype(np.float64)
+        else:
+            totals = self.incidence.T @ np.asarray(scores, dtype=np.float64)
+            vals = np.divide(totals, counts, out=np.zeros(self.n_pois), where=counts > 0)
+        vals[counts < min_routes] = 0.0
+        return vals
+
+def build_route_index(df: pd.DataFrame, col: str = "Sequence", n_pois: int | None = None) -> RouteIndex:
+    flat, offsets = parse_route_sequences(df[col])
+    return RouteIndex(flat, offsets, n_pois)
+
+def route_index_summary(index: RouteIndex) -> Dict[str, Any]:
+    return {"routes": len(index.offsets) - 1, "pois": index.n_pois, "stops": int(index.flat.size),
+            "transitions_nnz": int(index.transitions.nnz), "cooccurrence_nnz": int(index.cooccurrence.nnz)}
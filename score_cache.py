@@ -0,0 +1,73 @@
+from __future__ import annotations
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Tuple
+from data_prep import NUMS, CATS
+from model import score_routes_batch
+
+OVERRIDE_COLS = ["Weather", "Traffic_Level", "Crowd_Density", "Event_Impact", "Preferred_Theme", "Preferred_Transport"]
+
+def _key(user_overrides: Dict[str, Any]) -> Tuple | None:
+    # None numa posição = sem override; overrides fora de OVERRIDE_COLS não são materializados
+    if any(v is not None and k not in OVERRIDE_COLS for k, v in user_overrides.items()):
+        return None
+    return tuple(None if user_overrides.get(c) is None else str(user_overrides.get(c)) for c in OVERRIDE_COLS)
+
+class ScoreCache:
+    # scores de todas as rotas de `index` sob cada combinação materializada de overrides;
+    # os contadores têm lock porque o serviço consulta o cache a partir de várias threads
+    __slots__ = ("index", "rows", "scores", "hits", "misses", "_lock")
+
+    def __init__(self, index: pd.Index, rows: Dict[Tuple, int], scores: np.ndarray):
+        self.index = index
+        self.rows = rows
+        self.scores = scores
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def scores_for(self, user_overrides: Dict[str, Any], pool_index: pd.Index) -> np.ndarray | None:
+        key = _key(user_overrides)
+        row = self.rows.get(key) if key is not None else None
+        if row is None:
+            self._count(False)
+            return None
+        pos = self.index.get_indexer(pool_index)
+        if (pos < 0).any():
+            self._count(False)
+            return None
+        self._count(True)
+        return self.scores[row, pos].astype(np.float64)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {"combinations": len(self.rows), "routes": len(self.index), "bytes": int(self.scores.nbytes),
+                "hits": hits, "misses": misses, "hit_ratio": hits / total if total else 0.0}
+
+def build_score_cache(model, df: pd.DataFrame, top_n: int | None = None,
+                      max_bytes: int = 256 * 2**20) -> ScoreCache:
+    # materializa as combinações vistas nos dados (as top_n mais frequentes, se dado) e o
+    # cenário sem override; scores em float32 (n_combinações, n_rotas). As rotas são
+    # codificadas em blocos para o buffer denso (linhas x largura one-hot x 8) caber em max_bytes
+    combos = df[OVERRIDE_COLS].astype(str).value_counts()
+    if top_n is not None:
+        combos = combos.head(top_n)
+    keys: List[Tuple] = [tuple([None] * len(OVERRIDE_COLS))] + [tuple(k) for k in combos.index]
+    inputs = [{c: v for c, v in zip(OVERRIDE_COLS, k)} for k in keys]
+    scores = np.empty((len(keys), len(df)), dtype=np.float32)
+    if len(df):
+        width = model[0].transform(df[NUMS + CATS].head(1)).shape[1]
+        step = max(1, max_bytes // (width * 8))
+        for start in range(0, len(df), step):
+            score_routes_batch(model, df.iloc[start:start + step], inputs, out=scores[:, start:start + step])
+    return ScoreCache(df.index, {k: i for i, k in enumerate(keys)}, scores)
@@ -0,0 +1,194 @@
+from __future__ import annotations
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, Any
+import numpy as np
+import pandas as pd
+from data_prep import load_dynamic_csv, clean_dynamic, load_dynamic_clean, ConstraintIndex
+from model_store import load_or_train, DEFAULT_CACHE_DIR
+from recommender import recommend
+from score_cache import build_score_cache
+from bnb import branch_and_bound
+from heuristics import greedy_itinerary, improve_itinerary
+
+def _jsonable(o):
+    if isinstance(o, (np.generic,)):
+        return o.item()
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    return str(o)
+
+def _solve(req: Dict[str, Any]) -> Dict[str, Any]:
+    # roda no pool de processos: só recebe/devolve estruturas serializáveis
+    values = np.asarray(req["values"], dtype=np.float64)
+    visit_time = np.asarray(req["visit_time"], dtype=np.float64)
+    T = np.asarray(req["T"], dtype=np.float64)
+    time_limit = float(req["time_limit"])
+    solver = req.get("solver", "bnb")
+    if solver == "greedy":
+        return greedy_itinerary(values, visit_time, T, time_limit)
+    if solver == "local":
+        return improve_itinerary(values, visit_time, T, time_limit, time_budget_sec=float(req.get("time_budget_sec", 1.0)))
+    if solver != "bnb":
+        raise ValueError(f"solver desconhecido: {solver}")
+    res = branch_and_bound(values, visit_time, T, time_limit, max_nodes=int(req.get("max_nodes", 100000)),
+                           policy=req.get("policy", "best_first"), time_cap_seconds=req.get("time_cap_seconds"))
+    return {k: (float(v) if isinstance(v, np.floating) else v) for k, v in res.items()}
+
+class RecommendationService:
+    # dados, modelo e índices ficam residentes; scoring em threads (numpy/sklearn liberam o GIL),
+    # B&B em processos. Pedidos idênticos em andamento são coalescidos numa única execução
+    def __init__(self, df: pd.DataFrame, model, workers: int | None = None, score_cache=None):
+        self.df = df
+        self.model = model
+        self.index = ConstraintIndex(df)
+        self.score_cache = score_cache
+        self.threads = ThreadPoolExecutor(max_workers=workers)
+        self.procs = ProcessPoolExecutor(max_workers=workers)
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.latency_ms: Dict[str, deque] = {}
+        self.coalesced = 0
+
+    def close(self) -> None:
+        self.threads.shutdown(wait=False)
+        self.procs.shutdown(wait=False)
+
+    def _recommend(self, req: Dict[str, Any]):
+        rec = recommend(self.df, self.model, req.get("constraints", {}), req.get("overrides", {}),
+                        top_k=int(req.get("top_k", 10)), index=self.index, score_cache=self.score_cache)
+        return rec.to_dict(orient="records")
+
+    def _stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"inflight": len(self.inflight), "coalesced": self.coalesced, "ops": {}}
+        for op, lat in self.latency_ms.items():
+            arr = np.asarray(lat)
+            out["ops"][op] = {"count": int(arr.size), "p50_ms": float(np.percentile(arr, 50)),
+                              "p95_ms": float(np.percentile(arr, 95)), "max_ms": float(arr.max())}
+        if self.score_cache is not None:
+            out["score_cache"] = self.score_cache.stats()
+        return out
+
+    async def _dispatch(self, op: str, req: Dict[str, Any]):
+        loop = asyncio.get_running_loop()
+        if op == "recommend":
+            return await loop.run_in_executor(self.threads, self._recommend, req)
+        if op == "solve":
+            return await loop.run_in_executor(self.procs, _solve, req)
+        if op == "stats":
+            return self._stats()
+        raise ValueError(f"op desconhecida: {op}")
+
+    async def handle(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        if not isinstance(req, dict):
+            return {"id": None, "ok": False, "error": "pedido deve ser um objeto JSON",
+                    "latency_ms": (time.perf_counter() - t0) * 1000, "coalesced": False}
+        op = req.get("op")
+        key = json.dumps({k: v for k, v in req.items() if k != "id"}, sort_keys=True, default=_jsonable)
+        shared = op != "stats" and key in self.inflight
+        try:
+            if shared:
+                self.coalesced += 1
+                result = await asyncio.shield(self.inflight[key])
+            else:
+                task = asyncio.ensure_future(self._dispatch(op, req))
+                if op != "stats":
+                    self.inflight[key] = task
+                try:
+                    result = await task
+                finally:
+                    self.inflight.pop(key, None)
+            resp = {"id": req.get("id"), "ok": True, "result": result}
+        except Exception as e:
+            resp = {"id": req.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"}
+        elapsed = (time.perf_counter() - t0) * 1000
+        self.latency_ms.setdefault(str(op), deque(maxlen=10_000)).append(elapsed)
+        resp["latency_ms"] = elapsed
+        resp["coalesced"] = shared
+        return resp
+
+    async def _serve_lines(self, reader: asyncio.StreamReader, write) -> None:
+        lock = asyncio.Lock()
+        pending = set()
+
+        async def one(line: bytes) -> None:
+            try:
+                req = json.loads(line)
+            except json.JSONDecodeError as e:
+                resp = {"id": None, "ok": False, "error": f"JSON inválido: {e}"}
+            else:
+                resp = await self.handle(req)
+            async with lock:
+                await write(json.dumps(resp, default=_jsonable) + "\n")
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                t = asyncio.ensure_future(one(line))
+                pending.add(t)
+                t.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def serve_stdio(self) -> None:
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+        async def write(text: str) -> None:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+        await self._serve_lines(reader, write)
+
+    async def serve_tcp(self, host: str, port: int) -> None:
+        async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            async def write(text: str) -> None:
+                writer.write(text.encode("utf-8"))
+                await writer.drain()
+            try:
+                await self._serve_lines(reader, write)
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(client, host, port)
+        async with server:
+            await server.serve_forever()
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--csv", required=True)
+    p.add_argument("--fast-ingest", action="store_true")
+    p.add_argument("--model-cache", type=str, default=DEFAULT_CACHE_DIR)
+    p.add_argument("--backend", type=str, default="rf")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--materialize", type=int, default=0, help="pré-computa as N combinações de override mais comuns")
+    p.add_argument("--host", type=str, default="127.0.0.1")
+    p.add_argument("--port", type=int, default=None, help="sem porta: JSON-lines em stdin/stdout")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    df = load_dynamic_clean(args.csv) if args.fast_ingest else clean_dynamic(load_dynamic_csv(args.csv))
+    tr = load_or_train(df, cache_dir=args.model_cache, backend=args.backend)
+    cache = build_score_cache(tr["model"], df, top_n=args.materialize) if args.materialize else None
+    svc = RecommendationService(df, tr["model"], workers=args.workers, score_cache=cache)
+    print(f"serviço pronto: {len(df)} rotas, modelo {tr['metrics']['backend']} "
+          f"({'cache' if tr['cache_hit'] else 'treinado'})", file=sys.stderr)
+    try:
+        if args.port is None:
+            asyncio.run(svc.serve_stdio())
+        else:
+            asyncio.run(svc.serve_tcp(args.host, args.port))
+    finally:
+        svc.close()
+
+if __name__ == "__main__":
+    main()
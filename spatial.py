@@ -0,0 +1,57 @@
+from __future__ import annotations
+import numpy as np
+from typing import Dict, List
+from sklearn.neighbors import KDTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+def _project(coords: np.ndarray) -> np.ndarray:
+    # equiretangular em km em torno da latitude média; suficiente para vizinhança numa cidade
+    lat = np.radians(coords[:, 0])
+    lon = np.radians(coords[:, 1])
+    return np.column_stack([EARTH_RADIUS_KM * lon * np.cos(lat.mean()), EARTH_RADIUS_KM * lat])
+
+def knn_candidates(T: np.ndarray, k: int, coords: np.ndarray | None = None) -> List[np.ndarray]:
+    # para cada nó, os k vizinhos mais próximos (sem ele mesmo e sem o depósito); o depósito
+    # (nó 0) recebe todos os POIs, já que a primeira escolha não deve ser restringida
+    n = len(T)
+    k = min(k, n - 2) if n > 2 else 0
+    if k <= 0:
+        return [np.arange(1, n)] + [np.empty(0, dtype=np.int64) for _ in range(n - 1)]
+    if coords is not None:
+        _, nbrs = KDTree(_project(np.asarray(coords, dtype=np.float64))).query(
+            _project(np.asarray(coords, dtype=np.float64)), k=min(k + 2, n))
+    else:
+        rows = np.asarray(T, dtype=np.float64).copy()
+        np.fill_diagonal(rows, np.inf)
+        nbrs = np.argpartition(rows, min(k + 1, n - 1), axis=1)[:, :k + 2]
+        nbrs = np.take_along_axis(nbrs, np.argsort(np.take_along_axis(rows, nbrs, axis=1), axis=1), axis=1)
+    cands = [np.arange(1, n)]
+    for i in range(1, n):
+        row = nbrs[i]
+        cands.append(row[(row != i) & (row != 0)][:k].astype(np.int64))
+    return cands
+
+def prune_instance(values: np.ndarray, visit_time: np.ndarray, T: np.ndarray, time_limit: float,
+                   k: int = 20, coords: np.ndarray | None = None) -> Dict:
+    # remove POIs cuja ida e volta ao depósito já estoura time_limit e monta as listas de
+    # candidatos k-NN na instância reduzida; `keep[i]` é o id original do nó local i
+    values = np.asarray(values, dtype=np.float64)
+    visit_time = np.asarray(visit_time, dtype=np.float64)
+    T = np.asarray(T)
+    round_trip = T[0, :] + visit_time + T[:, 0]
+    keep = np.flatnonzero(round_trip <= time_limit)
+    keep = np.concatenate([[0], keep[keep != 0]])
+    Tk = np.asarray(T[np.ix_(keep, keep)], dtype=np.float64)
+    ck = np.asarray(coords)[keep] if coords is not None else None
+    return {
+        "keep": keep,
+        "values": values[keep],
+        "visit_time": visit_time[keep],
+        "T": Tk,
+        "candidates": knn_candidates(Tk, k, ck),
+        "dropped": int(len(values) - len(keep)),
+    }
+
+def restore_route(route: List[int], keep: np.ndarray) -> List[int]:
+    return [int(keep[i]) for i in route]
@@ -0,0 +1,41 @@
+
+import numpy as np
+from batch import solve_team, solve_many
+from bnb import branch_and_bound
+
+def instance(n=12, seed=0):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 100, size=(n, 2))
+    T = np.sqrt(((xy[:, None] - xy[None]) ** 2).sum(-1))
+    v = rng.integers(1, 10, n).astype(float); v[0] = 0
+    vis = np.full(n, 10.0); vis[0] = 0
+    return v, vis, T
+
+def test_team_routes_are_disjoint_and_feasible():
+    v, vis, T = instance()
+    res = solve_team(v, vis, T, [120, 200, 80])
+    pois = [p for r in res["routes"] for p in r["route"][1:-1]]
+    assert len(pois) == len(set(pois))
+    assert all(r["total_time"] <= r["time_limit"] + 1e-6 for r in res["routes"])
+    single = branch_and_bound(v, vis, T, 200)
+    assert res["routes"][1]["total_value"] == single["best_value"]
+    assert res["total_value"] >= single["best_value"]
+    greedy = solve_team(v, vis, T, 120, k=3, solver="greedy")
+    assert len(greedy["routes"]) == 3
+
+def test_solve_many_matches_serial():
+    v, vis, T = instance(seed=1)
+    rng = np.random.default_rng(5)
+    insts = [{"values": np.r_[0, rng.integers(1, 10, len(v) - 1)], "visit_time": vis, "time_limit": 150}
+             for _ in range(3)]
+    insts.append({"values": v, "visit_time": vis, "time_limit": 150, "k": 2})
+    par = solve_many(insts, T, workers=2)
+    ser = solve_many(insts, T, workers=1)
+    for p, s, inst in zip(par[:3], ser[:3], insts):
+        assert p["best_value"] == s["best_value"] == branch_and_bound(inst["values"], vis, T, 150)["best_value"]
+    assert par[3]["total_value"] == ser[3]["total_value"] and len(par[3]["routes"]) == 2
+
+def test_solve_many_k1_keeps_single_route_shape():
+    v, vis, T = instance(seed=2)
+    res = solve_many([{"values": v, "visit_time": vis, "time_limit": 150, "k": 1}], T, workers=1)[0]
+    assert "best_route" in res and res["best_value"] == branch_and_bound(v, vis, T, 150)["best_value"]
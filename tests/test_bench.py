@@ -0,0 +1,23 @@
+
+import numpy as np
+from bench import make_instance, write_synthetic_dynamic, compare
+from data_prep import load_dynamic_csv, clean_dynamic
+
+def test_instances_are_seeded():
+    a = make_instance(30, "clustered", seed=3)
+    b = make_instance(30, "clustered", seed=3)
+    assert np.array_equal(a["T"], b["T"]) and np.array_equal(a["values"], b["values"])
+    assert a["values"][0] == 0 and np.allclose(a["T"], a["T"].T)
+
+def test_synthetic_dynamic_in_chunks(tmp_path):
+    p = write_synthetic_dynamic(str(tmp_path / "d.csv"), 250, seed=1, chunk_rows=100)
+    df = clean_dynamic(load_dynamic_csv(p))
+    assert len(df) == 250 and df["Route_ID"].is_unique
+
+def test_compare_flags_regressions():
+    base = {"results": [{"name": "x", "wall_sec": 1.0, "nodes_per_sec": 1000.0, "best_value": 10.0},
+                        {"name": "y", "wall_sec": 0.001}]}
+    cur = {"results": [{"name": "x", "wall_sec": 1.1, "nodes_per_sec": 500.0, "best_value": 10.0},
+                       {"name": "y", "wall_sec": 0.004}]}
+    regs = compare(cur, base, tolerance=0.25)
+    assert [(r["name"], r["metric"]) for r in regs] == [("x", "nodes_per_sec")]
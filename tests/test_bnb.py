@@ -1,6 +1,6 @@
 
 import numpy as np
-from bnb import branch_and_bound
+from bnb import branch_and_bound, parallel_branch_and_bound
 
 def small_instance():
    
@@ -19,3 +19,82 @@ def test_bnb_finds_better_or_equal_than_greedy():
     res = branch_and_bound(v, vis, T, time_limit=70, max_nodes=10000)
     assert res["best_value"] >= 17.0  
     assert res["best_time"] <= 70 + 1e-6
+
+def test_compact_engine_matches_node_engine():
+    v, vis, T = small_instance()
+    a = branch_and_bound(v, vis, T, time_limit=70, max_nodes=10000, engine="node")
+    b = branch_and_bound(v, vis, T, time_limit=70, max_nodes=10000, engine="compact")
+    assert b["best_value"] == a["best_value"]
+    assert b["best_route"][0] == 0 and b["best_route"][-1] == 0
+
+def test_parallel_portfolio_matches_serial():
+    v, vis, T = small_instance()
+    serial = branch_and_bound(v, vis, T, time_limit=70, max_nodes=10000)
+    par = parallel_branch_and_bound(v, vis, T, time_limit=70, max_nodes=10000,
+                                    policies=("best_first", "depth_first"), workers=2)
+    assert par["best_value"] == serial["best_value"]
+    assert par["expanded_nodes"] == sum(w["expanded_nodes"] for w in par["workers"])
+
+def test_policies_report_peak_frontier():
+    v, vis, T = small_instance()
+    for policy in ("best_first", "depth_first", "beam"):
+        res = branch_and_bound(v, vis, T, time_limit=70, policy=policy, beam_width=2)
+        assert res["best_value"] >= 17.0
+        assert res["peak_frontier"] >= 1
+
+def test_progress_callback_trace_and_bound():
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(0, 100, size=(12, 2))
+    T = np.sqrt(((xy[:, None] - xy[None]) ** 2).sum(-1))
+    v = rng.integers(1, 10, 12).astype(float); v[0] = 0
+    vis = np.full(12, 10.0); vis[0] = 0
+    exact = branch_and_bound(v, vis, T, time_limit=200, max_nodes=10**6)
+    assert exact["gap"] == 0.0 and exact["best_bound"] == exact["best_value"]
+    calls = []
+    res = branch_and_bound(v, vis, T, time_limit=200, max_nodes=40, warm_start=False,
+                           progress=calls.append, progress_every=10, profile=True)
+    assert len(calls) == 4 and calls[-1]["expanded"] == 40
+    assert all(c["best_bound"] >= c["incumbent"] for c in calls)
+    assert res["best_bound"] >= exact["best_value"] - 1e-9
+    values = [t[1] for t in res["incumbent_trace"]]
+    assert values == sorted(values) and values[-1] == res["best_value"]
+    assert set(res["phase_sec"]) == {"warm_start", "bound", "expand", "total"}
+
+def test_dominance_table_keeps_optimum_and_prunes():
+    rng = np.random.default_rng(2)
+    xy = rng.uniform(0, 100, size=(14, 2))
+    T = np.sqrt(((xy[:, None] - xy[None]) ** 2).sum(-1))
+    v = rng.integers(1, 10, 14).astype(float); v[0] = 0
+    vis = np.full(14, 10.0); vis[0] = 0
+    plain = branch_and_bound(v, vis, T, time_limit=200, max_nodes=10**6, dominance=None)
+    dom = branch_and_bound(v, vis, T, time_limit=200, max_nodes=10**6)
+    tiny = branch_and_bound(v, vis, T, time_limit=200, max_nodes=10**6, dominance=4)
+    assert plain["dominance"] is None
+    assert dom["best_value"] == plain["best_value"] == tiny["best_value"]
+    assert dom["dominance"]["pruned"] > 0 and dom["expanded_nodes"] < plain["expanded_nodes"]
+    assert tiny["dominance"]["entries"] <= 4 and tiny["dominance"]["evictions"] > 0
+
+def test_parallel_portfolio_respects_time_cap_with_fewer_workers():
+    import time
+    rng = np.random.default_rng(1)
+    xy = rng.uniform(0, 100, size=(60, 2))
+    T = np.sqrt(((xy[:, None] - xy[None]) ** 2).sum(-1))
+    v = rng.integers(1, 11, 60).astype(float); v[0] = 0
+    vis = rng.uniform(5, 30, 60); vis[0] = 0
+    t0 = time.time()
+    res = parallel_branch_and_bound(v, vis, T, 240, max_nodes=10**7, workers=1,
+                                    policies=("best_first", "depth_first", "beam"), time_cap_seconds=0.5)
+    assert time.time() - t0 < 1.25
+    assert sum(w["runtime_sec"] for w in res["workers"]) < 0.75
+
+def test_node_store_tracks_frontier_not_expansions():
+    rng = np.random.default_rng(1)
+    xy = rng.uniform(0, 100, size=(60, 2))
+    T = np.sqrt(((xy[:, None] - xy[None]) ** 2).sum(-1))
+    v = rng.integers(1, 11, 60).astype(float); v[0] = 0
+    vis = rng.uniform(5, 30, 60); vis[0] = 0
+    res = branch_and_bound(v, vis, T, 240, max_nodes=20000, max_frontier=1000)
+    assert res["frontier_truncated"]
+    assert res["peak_frontier"] < 1200 and res["peak_store"] < 5 * res["peak_frontier"]
+    r = res["best_route"]
+    assert r[0] == r[-1] == 0 and abs(v[r[1:-1]].sum() - res["best_value"]) < 1e-9
@@ -1,6 +1,6 @@
 
 import numpy as np
-from bnb import fractional_bound, Node
+from bnb import fractional_bound, Node, BoundEngine
 
 def test_fractional_bound_monotonic():
     values = np.array([0, 10, 9], float)
@@ -15,3 +15,57 @@ def test_fractional_bound_monotonic():
     b1 = fractional_bound(values, visit, T, node, time_limit=40)
     b2 = fractional_bound(values, visit, T, node, time_limit=60)
     assert b2 >= b1
+
+def test_bound_engine_is_valid_and_monotonic():
+    values = np.array([0, 10, 9, 4], float)
+    visit = np.array([0, 10, 10, 5], float)
+    T = np.array([
+        [0, 10, 10, 5],
+        [10, 0, 10, 5],
+        [10, 10, 0, 5],
+        [5, 5, 5, 0]
+    ], float)
+    engine = BoundEngine(values, visit, T)
+    visited = np.array([True, False, False, False])
+    prev = -1.0
+    # ótimos por enumeração: 0-3-0 (20 min), 0-1-3-0 (35), 0-1-3-2-0 (55)
+    for limit, optimum in ((20, 4.0), (40, 14.0), (60, 23.0), (200, 23.0)):
+        b = engine.bound(0, visited, 0.0, limit)
+        assert b >= optimum - 1e-9
+        assert b >= prev
+        prev = b
+
+def test_bound_engine_never_cuts_the_optimum():
+    import itertools
+    from bnb import branch_and_bound
+    for seed in range(10):
+        rng = np.random.default_rng(seed)
+        xy = rng.uniform(0, 100, (6, 2))
+        T = np.sqrt(((xy[:, None] - xy[None]) ** 2).sum(-1))
+        values = rng.integers(1, 10, 6).astype(float); values[0] = 0
+        visit = rng.uniform(5, 20, 6); visit[0] = 0
+        limit = rng.uniform(100, 250)
+        best = 0.0
+        for r in range(1, 6):
+            for perm in itertools.permutations(range(1, 6), r):
+                route = [0, *perm, 0]
+                t = sum(T[a, b] for a, b in zip(route, route[1:])) + visit[list(perm)].sum()
+                if t <= limit:
+                    best = max(best, values[list(perm)].sum())
+        root = BoundEngine(values, visit, T).bound(0, np.eye(1, 6, 0, dtype=bool)[0], 0.0, limit)
+        assert root >= best - 1e-9
+        assert branch_and_bound(values, visit, T, limit, max_nodes=10**6)["best_value"] == best
+
+def test_children_bounds_chunked_matches_single_block(monkeypatch):
+    rng = np.random.default_rng(3)
+    xy = rng.uniform(0, 100, (40, 2))
+    T = np.sqrt(((xy[:, None] - xy[None]) ** 2).sum(-1))
+    values = rng.integers(1, 10, 40).astype(float); values[0] = 0
+    visit = rng.uniform(5, 20, 40); visit[0] = 0
+    engine = BoundEngine(values, visit, T)
+    visited = np.zeros(40, dtype=bool); visited[[0, 3, 7]] = True
+    children = np.flatnonzero(~visited)
+    caps = rng.uniform(0, 300, len(children))
+    full = engine.children_bounds(children, visited, values[children], caps)
+    monkeypatch.setattr(BoundEngine, "CHUNK_CELLS", 50)
+    assert np.allclose(engine.children_bounds(children, visited, values[children], caps), full)
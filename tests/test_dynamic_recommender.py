@@ -0,0 +1,102 @@
+
+import numpy as np
+import pandas as pd
+import pytest
+from data_prep import load_dynamic_csv, clean_dynamic, split_features
+from model import build_model, score_routes, score_routes_batch, importance_report, select_backend, train_and_eval
+from recommender import recommend, recommend_batch, recommend_stream, pareto_mask, pareto_frontier
+from score_cache import build_score_cache, OVERRIDE_COLS
+
+@pytest.fixture(scope="module")
+def trained():
+    df = clean_dynamic(load_dynamic_csv("sample_data/dynamic.csv"))
+    X, y = split_features(df)
+    model = build_model()
+    model.set_params(reg__n_estimators=20)
+    model.fit(X, y)
+    return df, model
+
+SCENARIOS = [
+    {"Weather": "Rainy", "Traffic_Level": "High"},
+    {"Preferred_Theme": "Shopping", "Crowd_Density": None},
+    {"Weather": "Nonexistent"},
+    {},
+]
+
+def test_batch_scores_match_single_scenario(trained):
+    df, model = trained
+    pool = df.head(200)
+    batch = score_routes_batch(model, pool, SCENARIOS)
+    assert batch.shape == (len(SCENARIOS), len(pool))
+    for row, inputs in zip(batch, SCENARIOS):
+        assert np.allclose(row, score_routes(model, pool, inputs))
+
+def test_recommend_batch_matches_recommend(trained):
+    df, model = trained
+    constraints = {"max_duration": 400, "max_cost": None, "budget": "Any"}
+    recs = recommend_batch(df, model, constraints, SCENARIOS, top_k=5)
+    for rec, inputs in zip(recs, SCENARIOS):
+        single = recommend(df, model, constraints, inputs, top_k=5)
+        assert np.allclose(rec["Predicted_Satisfaction"].values, single["Predicted_Satisfaction"].values)
+
+def test_recommend_stream_matches_in_memory(trained):
+    df, model = trained
+    constraints = {"max_duration": None, "max_cost": 3000, "budget": "Any"}
+    overrides = {"Weather": "Sunny"}
+    streamed = recommend_stream("sample_data/dynamic.csv", model, constraints, overrides, top_k=7, chunksize=200)
+    full = recommend(df, model, constraints, overrides, top_k=7)
+    assert list(streamed.columns) == list(full.columns)
+    assert np.allclose(np.sort(streamed["Predicted_Satisfaction"].values), np.sort(full["Predicted_Satisfaction"].values))
+
+def test_pareto_mask_three_objectives():
+    df = pd.DataFrame({
+        "Total_Cost":             [100, 100, 200, 50, 300, 50],
+        "Total_Duration":         [60,  60,  30,  90, 90,  90],
+        "Predicted_Satisfaction": [4.0, 4.0, 3.0, 2.0, 4.5, 1.0],
+    })
+    # iguais não se dominam; a última é dominada pela quarta (mesmo custo/duração, menor satisfação)
+    assert pareto_mask(df).tolist() == [True, True, True, True, True, False]
+    assert pareto_mask(df, score_col=None).tolist() == [True, True, True, True, False, True]
+    fr, dom = pareto_frontier(df)
+    assert len(fr) == 5 and list(dom.index) == [5]
+
+def test_score_cache_hits_and_falls_back(trained):
+    df, model = trained
+    cache = build_score_cache(model, df, top_n=5)
+    combo = df[OVERRIDE_COLS].astype(str).value_counts().index[0]
+    hit = dict(zip(OVERRIDE_COLS, combo))
+    constraints = {"max_duration": 300, "max_cost": None, "budget": "Low"}
+    for overrides in (hit, {}, {"Weather": "Rainy"}):
+        cached = recommend(df, model, constraints, overrides, top_k=5, score_cache=cache)
+        live = recommend(df, model, constraints, overrides, top_k=5)
+        assert np.allclose(cached["Predicted_Satisfaction"].values, live["Predicted_Satisfaction"].values, atol=1e-5)
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1
+    assert cache.scores.dtype == np.float32
+    # blocos de rotas pequenos (orçamento de memória) dão os mesmos scores
+    small = build_score_cache(model, df, top_n=5, max_bytes=200_000)
+    assert np.allclose(small.scores, cache.scores)
+
+def test_importance_report_methods(trained):
+    df, model = trained
+    X, y = split_features(df.head(300))
+    imp = importance_report(model, X, y, method="impurity")["table"]
+    assert set(imp["feature"]) == set(X.columns)
+    assert abs(imp["importance"].sum() - 1.0) < 1e-6
+    rep = importance_report(model, X, y, method="subsample", max_rows=100, max_repeats=4)
+    assert rep["rows"] == 100 and len(rep["table"]) == X.shape[1]
+    assert rep["table"]["repeats"].between(3, 4).all()
+
+def test_select_backend_prefers_fastest_within_tolerance():
+    table = pd.DataFrame({"backend": ["rf", "hgb", "ridge"], "mae": [1.00, 1.04, 1.20],
+                          "predict_ms_per_10k": [800.0, 300.0, 50.0], "model_bytes": [10**7, 10**6, 10**4]})
+    assert select_backend(table, tolerance=0.05) == "hgb"
+    assert select_backend(table, tolerance=0.25) == "ridge"
+
+def test_train_and_eval_reports_serving_cost():
+    df = clean_dynamic(load_dynamic_csv("sample_data/dynamic.csv"))
+    tr = train_and_eval(df, backend="ridge")
+    assert tr["metrics"]["backend"] == "ridge"
+    assert tr["metrics"]["model_bytes"] > 0 and "predict_ms_per_10k" not in tr["metrics"]
+    tr = train_and_eval(df, backend="ridge", serving_cost=True)
+    assert tr["metrics"]["predict_ms_per_10k"] > 0 and tr["metrics"]["model_bytes"] > 0
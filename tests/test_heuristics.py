@@ -0,0 +1,18 @@
+
+import numpy as np
+from heuristics import greedy_itinerary, improve_itinerary
+
+def test_improve_never_worse_than_greedy_and_feasible():
+    rng = np.random.default_rng(0)
+    xy = rng.random((30, 2)) * 20
+    T = np.linalg.norm(xy[:, None] - xy[None], axis=2)
+    visit = rng.uniform(10, 30, 30)
+    visit[0] = 0
+    values = rng.uniform(1, 10, 30)
+    values[0] = 0
+    g = greedy_itinerary(values, visit, T, time_limit=240)
+    r = improve_itinerary(values, visit, T, time_limit=240, time_budget_sec=1.0)
+    assert r["total_value"] >= g["total_value"]
+    assert r["total_time"] <= 240 + 1e-6
+    assert r["route"][0] == 0 and r["route"][-1] == 0
+    assert len(set(r["route"][1:-1])) == len(r["route"]) - 2
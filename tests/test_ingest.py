@@ -0,0 +1,22 @@
+from data_prep import load_dynamic_csv, clean_dynamic, load_dynamic_clean, filter_constraints, ConstraintIndex
+
+def test_fast_ingest_matches_clean_dynamic(tmp_path):
+    src = tmp_path / "dynamic.csv"
+    src.write_bytes(open("sample_data/dynamic.csv", "rb").read())
+    slow = clean_dynamic(load_dynamic_csv(str(src)))
+    fast = load_dynamic_clean(str(src))
+    assert list(fast.columns) == list(slow.columns) and len(fast) == len(slow)
+    assert str(fast["Weather"].dtype) == "category"
+    assert (fast["Weather"].astype(str).values == slow["Weather"].values).all()
+    assert (fast["Total_Cost"].values == slow["Total_Cost"].values).all()
+    assert fast.memory_usage(deep=True).sum() * 3 <= slow.memory_usage(deep=True).sum()
+    again = load_dynamic_clean(str(src))
+    assert again.equals(fast)
+
+def test_constraint_index_matches_filter_constraints():
+    df = clean_dynamic(load_dynamic_csv("sample_data/dynamic.csv"))
+    index = ConstraintIndex(df)
+    for max_duration, max_cost, budget in [(None, None, "Any"), (300, None, None), (None, 1500, "Low"), (200, 800, "High"), (400, 2000, "Nope")]:
+        expected = filter_constraints(df, max_duration, max_cost, budget)
+        got = filter_constraints(df, max_duration, max_cost, budget, index=index)
+        assert got.index.equals(expected.index)
@@ -0,0 +1,14 @@
+
+from data_prep import load_dynamic_csv, clean_dynamic
+from model_store import load_or_train, dataset_fingerprint
+
+def test_second_load_hits_cache_and_evicts(tmp_path):
+    df = clean_dynamic(load_dynamic_csv("sample_data/dynamic.csv")).head(300)
+    first = load_or_train(df, cache_dir=str(tmp_path), max_entries=1)
+    second = load_or_train(df, cache_dir=str(tmp_path), max_entries=1)
+    assert not first["cache_hit"] and second["cache_hit"]
+    assert second["metrics"] == first["metrics"]
+    other = df.head(200)
+    assert dataset_fingerprint(other) != first["fingerprint"]
+    load_or_train(other, cache_dir=str(tmp_path), max_entries=1)
+    assert len(list(tmp_path.glob("*.joblib"))) == 1
@@ -25,3 +25,22 @@ def test_build_matrices_shapes():
     D, T, pts = build_distance_time_matrices(df, start_lat=0.0, start_lon=0.0, speed_kmh=30.0)
     assert D.shape == (3,3) and T.shape == (3,3)
     assert pts.iloc[0]["name"] == "Hotel/Depósito"
+
+def test_matrix_cache_roundtrip(tmp_path):
+    import numpy as np
+    from data_prep import solver_inputs
+    df = pd.DataFrame({
+        "name": ["A", "B", "C"],
+        "latitude": [-8.6, -8.5, -8.7],
+        "longitude": [115.1, 115.2, 115.3],
+        "rating": [4.5, 3.0, 5.0],
+        "price_level": [1, 2, 0],
+        "est_time_min": [30, 45, 60]
+    })
+    D, T, pts = build_distance_time_matrices(df, -8.65, 115.2, 30.0, cache_dir=str(tmp_path), mmap_threshold=2)
+    D2, T2, _ = build_distance_time_matrices(df, -8.65, 115.2, 30.0, cache_dir=str(tmp_path), mmap_threshold=2)
+    assert D.dtype == np.float32 and np.allclose(D, D2) and np.allclose(T, T2)
+    assert np.allclose(T, D / 30.0 * 60.0) and np.allclose(D, D.T)
+    assert len(list(tmp_path.glob("*.npy"))) == 2
+    values, visit = solver_inputs(pts)
+    assert values[0] == 0 and visit[0] == 0 and values[3] == 5.0
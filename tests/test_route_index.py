@@ -0,0 +1,21 @@
+
+import numpy as np
+import pandas as pd
+from data_prep import parse_route_sequences
+from route_index import build_route_index
+
+def test_parse_route_sequences_csr():
+    flat, offsets = parse_route_sequences(pd.Series(["1->2", "", None, " 3 -> 4 ->5"]))
+    assert flat.dtype == np.int32 and flat.tolist() == [1, 2, 3, 4, 5]
+    assert offsets.tolist() == [0, 2, 2, 2, 5]
+
+def test_route_index_lookups():
+    df = pd.DataFrame({"Sequence": ["1->2->3", "2->3", "3->1", "4"]})
+    idx = build_route_index(df)
+    assert idx.routes_with(3).tolist() == [0, 1, 2]
+    assert idx.routes_with_all([2, 3]).tolist() == [0, 1]
+    assert idx.transitions[2, 3] == 2 and idx.transitions[3, 1] == 1 and idx.transitions[3, 4] == 0
+    assert idx.cooccurrence[1, 3] == 2 and idx.cooccurrence[3, 3] == 3
+    assert idx.similar_routes(1, top_k=1)["route"].tolist() == [0]
+    vals = idx.poi_values(np.array([5.0, 3.0, 1.0, 4.0]))
+    assert vals[3] == 3.0 and vals[4] == 4.0 and vals[0] == 0.0
@@ -0,0 +1,37 @@
+
+import asyncio
+import numpy as np
+from data_prep import load_dynamic_csv, clean_dynamic, split_features
+from model import build_model
+from service import RecommendationService
+
+def make_service():
+    df = clean_dynamic(load_dynamic_csv("sample_data/dynamic.csv"))
+    X, y = split_features(df)
+    model = build_model(backend="ridge").fit(X, y)
+    return RecommendationService(df, model, workers=2)
+
+def test_service_recommend_coalesces_and_solves():
+    svc = make_service()
+    req = {"op": "recommend", "constraints": {"max_duration": 300, "budget": "Low"},
+           "overrides": {"Weather": "Rainy"}, "top_k": 3}
+
+    async def run():
+        a, b = await asyncio.gather(svc.handle(dict(req, id=1)), svc.handle(dict(req, id=2)))
+        T = [[0, 10, 10], [10, 0, 10], [10, 10, 0]]
+        s = await svc.handle({"op": "solve", "values": [0, 5, 4], "visit_time": [0, 10, 10],
+                              "T": T, "time_limit": 50, "id": 3})
+        bad = await svc.handle({"op": "nope", "id": 4})
+        not_obj = await svc.handle([1])
+        stats = await svc.handle({"op": "stats"})
+        return a, b, s, bad, not_obj, stats
+
+    try:
+        a, b, s, bad, not_obj, stats = asyncio.run(run())
+    finally:
+        svc.close()
+    assert a["ok"] and b["ok"] and len(a["result"]) == 3
+    assert a["result"] == b["result"] and (a["coalesced"] or b["coalesced"])
+    assert s["ok"] and s["result"]["best_value"] == 9.0
+    assert not bad["ok"] and not not_obj["ok"]
+    assert stats["result"]["ops"]["recommend"]["count"] == 2
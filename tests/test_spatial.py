@@ -0,0 +1,25 @@
+
+import numpy as np
+from spatial import prune_instance, restore_route
+from bnb import branch_and_bound
+from heuristics import greedy_itinerary
+
+def grid_instance():
+    coords = np.array([[0.0, 0.0]] + [[0.01 * i, 0.0] for i in range(1, 6)] + [[1.0, 1.0]])
+    xy = np.radians(coords) * 6371.0
+    T = np.linalg.norm(xy[:, None] - xy[None], axis=2) / 30.0 * 60.0
+    values = np.array([0, 5, 4, 3, 2, 1, 100], float)
+    visit = np.array([0, 10, 10, 10, 10, 10, 10], float)
+    return values, visit, T, coords
+
+def test_prune_drops_unreachable_and_restores_ids():
+    values, visit, T, coords = grid_instance()
+    p = prune_instance(values, visit, T, time_limit=120, k=2, coords=coords)
+    assert 6 not in p["keep"] and p["dropped"] == 1
+    assert len(p["candidates"][0]) == len(p["keep"]) - 1
+    assert all(len(c) <= 2 and 0 not in c for c in p["candidates"][1:])
+    res = branch_and_bound(p["values"], p["visit_time"], p["T"], 120, candidates=p["candidates"])
+    g = greedy_itinerary(p["values"], p["visit_time"], p["T"], 120, candidates=p["candidates"])
+    route = restore_route(res["best_route"], p["keep"])
+    assert route[0] == 0 and route[-1] == 0 and 6 not in route
+    assert res["best_value"] >= g["total_value"]